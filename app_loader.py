@@ -0,0 +1,50 @@
+"""
+Load pure helpers from streamlit_app.py without executing the app.
+Importing the app module needs Streamlit secrets and an OpenAI client,
+so tests exec just the functions (and module constants) they exercise.
+"""
+import ast
+import functools
+import glob
+import hashlib
+import inspect
+import io
+import itertools
+import os
+import pickle
+import re
+import string
+import tempfile
+import time
+import zlib
+
+# Stdlib modules the loaded helpers may reference
+MODULES = (functools, glob, hashlib, inspect, io, itertools, os, pickle, re, string, tempfile, time, zlib)
+
+# Names whose use marks a constant as depending on the Streamlit runtime
+RUNTIME_NAMES = {"st", "openai", "client"}
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py")
+
+
+def is_plain_constant(node):
+    """True for UPPER_CASE module assignments that do not touch the runtime."""
+    if not isinstance(node, ast.Assign):
+        return False
+    if not all(isinstance(t, ast.Name) and t.id.isupper() for t in node.targets):
+        return False
+    return not any(isinstance(n, ast.Name) and n.id in RUNTIME_NAMES for n in ast.walk(node.value))
+
+
+def load_app_functions(*names):
+    """Exec the named top-level functions and the plain constants from streamlit_app.py."""
+    with open(APP_PATH, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    nodes = [
+        node for node in tree.body
+        if (isinstance(node, ast.FunctionDef) and node.name in names) or is_plain_constant(node)
+    ]
+    namespace = {"__file__": APP_PATH}
+    namespace.update((m.__name__, m) for m in MODULES)
+    exec(compile(ast.Module(body=nodes, type_ignores=[]), APP_PATH, "exec"), namespace)
+    return namespace
@@ -1,12 +1,33 @@
 import streamlit as st
 import re
 import openai
-import traceback
+import httpx
 import requests
-import yt_dlp
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import glob
 import string
+import asyncio
+import json
+import hashlib
+import io
+import time
+import pickle
+import zlib
+import functools
+import inspect
+import itertools
+import atexit
+import tempfile
+import uuid
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to character-based chunking
+    tiktoken = None
 
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
@@ -18,14 +39,80 @@ from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFoun
 # fileWatcherType = "none"
 # ------------------------------------------------------------------------------
 
-# Initialize OpenAI client (adjust base_url if you use a custom endpoint)
-client = openai.OpenAI(
-    api_key=st.secrets["OPENAI_API_KEY"],
-    base_url=st.secrets.get("OPENAI_BASE_URL")  # optional
-)
+# Must be the first Streamlit command of every run
+st.set_page_config(page_title="YouTube Tools", layout="wide")
+
+# OpenAI client settings (adjust base_url if you use a custom endpoint).
+# The SDK retries 429/5xx/connection errors itself with exponential backoff.
+OPENAI_CLIENT_OPTIONS = {
+    "api_key": st.secrets["OPENAI_API_KEY"],
+    "base_url": st.secrets.get("OPENAI_BASE_URL"),  # optional
+    "max_retries": 4,
+    "timeout": httpx.Timeout(120.0, connect=5.0),
+}
+
+
+@st.cache_resource
+def get_client() -> openai.OpenAI:
+    """
+    OpenAI client with a keep-alive connection pool. Cached as a resource
+    so the client and its connections survive Streamlit reruns.
+    """
+    return openai.OpenAI(
+        **OPENAI_CLIENT_OPTIONS,
+        http_client=httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=32)
+        ),
+    )
+
 
 # Constants
-CHUNK_SIZE = 100000   # characters per transcript chunk
+MODEL = "Meta-Llama-4-Maverick-17B-128E-Instruct-FP8"   # chat model used for every request
+CHUNK_TOKENS = 24000   # tokens per transcript chunk
+MODEL_CONTEXT_TOKENS = 100000   # transcript tokens that fit in one request
+MERGE_FANIN = 4   # chunk summaries combined per request when merging a long transcript
+BATCH_FAILED_STATUSES = frozenset({"failed", "expired", "cancelling", "cancelled"})   # never complete
+CHARS_PER_TOKEN = 4   # rough ratio used when no tokenizer is available
+CHUNK_SIZE = CHUNK_TOKENS * CHARS_PER_TOKEN   # characters per chunk in that fallback
+CACHE_TTL = 3600   # seconds to keep transcripts and language lists cached
+LLM_CACHE_TTL = 86400   # seconds to keep summaries and quizzes cached, in memory and on disk
+DISK_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ytquiz_cache")
+DISK_CACHE_TTL = 7 * 86400   # seconds to keep fetched transcripts on disk across restarts
+MAX_TITLE_LENGTH = 50   # characters kept from a video title in download filenames
+TRANSCRIPT_PREVIEW_CHARS = 20000   # transcript characters sent to the browser for display
+MAX_URL_SCAN = 2048   # leading URL characters searched for a video ID
+DOWNLOAD_PROBE_CONCURRENCY = 4   # videos whose formats are fetched at once on the download page
+DOWNLOAD_RANGE_PARTS = 8   # parallel Range requests per server-side video download
+DOWNLOAD_RANGE_MIN_BYTES = 1024 * 1024   # smallest slice worth its own connection
+DOWNLOAD_RANGE_PASSES = 3   # attempts at the missing ranges before falling back to yt_dlp
+DOWNLOAD_PARTIAL_TTL = 6 * 3600   # seconds before an abandoned ranged download is deleted
+DOWNLOAD_KEEP_BYTES = 1024 * 1024 * 1024   # finished downloads kept for reuse, across all sessions
+# Max in-flight chunk summarization requests (respects provider rate limits)
+OPENAI_CONCURRENCY = int(st.secrets.get("OPENAI_CONCURRENCY", 8))
+# googlevideo links only work from the IP that resolved them, so offering them
+# to the browser is opt-in for deployments where server and user share an IP
+DIRECT_DOWNLOAD_LINKS = str(st.secrets.get("DIRECT_DOWNLOAD_LINKS", "")).strip().lower() in ("1", "true", "yes", "on")
+
+# Precompiled patterns
+BARE_VIDEO_ID_RE = re.compile(r"[a-zA-Z0-9_-]{11}", re.ASCII)   # used with fullmatch
+VIDEO_ID_RE = re.compile(
+    r"(?:youtube\.com/(?:watch\?(?:[^#]*&)?v=|live/|embed/|shorts/|v/|e/)|youtu\.be/)"
+    r"([a-zA-Z0-9_-]{11})",
+    re.IGNORECASE | re.ASCII,   # no Unicode case folding into IDs (e.g. Kelvin sign -> k)
+)
+FALLBACK_VIDEO_ID_RE = re.compile(r"([a-zA-Z0-9_-]{11})", re.ASCII)
+VTT_TAG_RE = re.compile(r"<[^>]*>")   # inline <c>, <00:00:01.000> etc. tags in captions
+# Section headings of a combined summary + quiz reply, tolerating markdown decoration
+SUMMARY_HEADING_RE = re.compile(r"^[#*\s]*SUMMARY:?[*\s]*$", re.MULTILINE | re.IGNORECASE)
+QUIZ_HEADING_RE = re.compile(r"^[#*\s]*QUIZ:?[*\s]*$", re.MULTILINE | re.IGNORECASE)
+VALID_TITLE_CHARS = frozenset("-_.() %s%s" % (string.ascii_letters, string.digits))
+# str.translate table for titles: ASCII whitespace -> space, every other ASCII
+# character outside VALID_TITLE_CHARS deleted (non-ASCII is dropped beforehand)
+TITLE_TRANSLATION = str.maketrans(
+    string.whitespace,
+    " " * len(string.whitespace),
+    "".join(c for c in map(chr, range(128)) if c not in VALID_TITLE_CHARS and c not in string.whitespace),
+)
 
 # ------------------------------------------------------------------------------
 # Session state defaults
@@ -36,13 +123,18 @@ defaults = {
     "submitted": False,
     "video_id": "",
     "langs": {},
+    "lang_keys": (),
+    "lang_labels": {},
     "used_proxy_for_langs": None,
+    "langs_attempt": None,
     "selected_lang": "",
     "transcript": "",
     "used_proxy_for_transcript": None,
     "transcript_fetched": False,
+    "transcript_single_chunk": False,   # fits_one_chunk(transcript), measured once per fetch
     "summary": "",
     "summary_generated": False,
+    "summary_batch_id": "",
     "quiz": "",
     "quiz_generated": False,
     "mod_instructions": "",
@@ -50,11 +142,13 @@ defaults = {
     "updated_pending": False,
     # Download-specific state
     "download_url": "",
-    "download_video_id": "",
-    "download_formats": [],
+    "download_video_ids": [],
+    "download_formats": {},   # video_id -> formats from get_video_formats
     "download_submitted": False,
     "download_cookie_option": "none",
     "download_cookie_file": None,
+    "download_files": {},   # "video_id:format_id" -> file downloaded earlier in this session
+    "download_token": uuid.uuid4().hex[:8],   # keeps this session's partial downloads apart
 }
 for key, val in defaults.items():
     if key not in st.session_state:
@@ -68,49 +162,27 @@ def get_video_id(url: str) -> str:
     Extract YouTube video ID from URL or return input if already an ID.
     Supports all YouTube URL formats including live, shorts, embed, and mobile URLs.
     """
-    import re
-    
     # Clean up the input
     url = url.strip()
     
     # If it's already a video ID (11 characters, alphanumeric + - _), return it
-    if re.match(r'^[a-zA-Z0-9_-]{11}$', url):
+    if BARE_VIDEO_ID_RE.fullmatch(url):
         return url
     
-    # YouTube video ID regex patterns for different URL formats
-    patterns = [
-        # Standard watch URLs: youtube.com/watch?v=VIDEO_ID
-        r'(?:youtube\.com/watch\?v=)([a-zA-Z0-9_-]{11})',
-        
-        # Short URLs: youtu.be/VIDEO_ID
-        r'(?:youtu\.be/)([a-zA-Z0-9_-]{11})',
-        
-        # Live URLs: youtube.com/live/VIDEO_ID
-        r'(?:youtube\.com/live/)([a-zA-Z0-9_-]{11})',
-        
-        # Embed URLs: youtube.com/embed/VIDEO_ID
-        r'(?:youtube\.com/embed/)([a-zA-Z0-9_-]{11})',
-        
-        # Shorts URLs: youtube.com/shorts/VIDEO_ID
-        r'(?:youtube\.com/shorts/)([a-zA-Z0-9_-]{11})',
-        
-        # Mobile URLs: m.youtube.com/watch?v=VIDEO_ID
-        r'(?:m\.youtube\.com/watch\?v=)([a-zA-Z0-9_-]{11})',
-        
-        # Gaming URLs: gaming.youtube.com/watch?v=VIDEO_ID
-        r'(?:gaming\.youtube\.com/watch\?v=)([a-zA-Z0-9_-]{11})',
-    ]
+    # Real links carry the ID well inside this prefix; bounding the scan keeps
+    # pasted junk (e.g. "youtube.com/watch?" repeated) from backtracking for seconds
+    head = url[:MAX_URL_SCAN]
     
-    # Try each pattern
-    for pattern in patterns:
-        match = re.search(pattern, url, re.IGNORECASE)
-        if match:
-            return match.group(1)
+    # One pass over the URL covers watch (incl. m./gaming.), youtu.be, live, embed, shorts, /v/ and /e/
+    match = VIDEO_ID_RE.search(head)
+    if match:
+        return match.group(1)
     
     # If no pattern matches and it looks like a YouTube URL, try fallback extraction
-    if 'youtube.com' in url.lower() or 'youtu.be' in url.lower():
+    lowered = head.lower()
+    if 'youtube.com' in lowered or 'youtu.be' in lowered:
         # Last resort: look for any 11-character alphanumeric sequence that could be a video ID
-        fallback_match = re.search(r'([a-zA-Z0-9_-]{11})', url)
+        fallback_match = FALLBACK_VIDEO_ID_RE.search(head)
         if fallback_match:
             return fallback_match.group(1)
     
@@ -119,6 +191,143 @@ def get_video_id(url: str) -> str:
     return url
 
 
+def parse_video_ids(url_input: str) -> list[str]:
+    """
+    Convert comma-separated YouTube URLs or IDs into a list of video IDs,
+    without duplicates, in input order.
+    """
+    return list(dict.fromkeys(get_video_id(u) for u in url_input.split(",") if u.strip()))
+
+
+def sanitize_title(title: str, video_id: str) -> str:
+    """
+    Turn a video title into a cross-platform safe filename stem.
+    Falls back to "video_<id prefix>" when nothing usable remains.
+    """
+    clean_title = title.encode("ascii", "ignore").decode("ascii").translate(TITLE_TRANSLATION)
+    clean_title = " ".join(clean_title.split())[:MAX_TITLE_LENGTH].rstrip()
+    return clean_title or f"video_{video_id[:8]}"
+
+
+def disk_cached(ttl: int):
+    """
+    Decorator persisting a function's results as zlib-compressed pickle
+    files under DISK_CACHE_DIR for ttl seconds, so they survive process
+    restarts. Sits under @st.cache_data, which keeps the hot path in memory.
+    Entries are keyed on every argument, however it is passed, except
+    parameters whose names start with an underscore (e.g. proxy settings);
+    like st.cache_data, those are passed through without affecting the key.
+    Exceptions are not cached; unreadable or unwritable entries are
+    treated as cache misses. Each write first deletes the function's
+    expired entries, so the directory does not grow without bound.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            keyed = [(name, value) for name, value in bound.arguments.items() if not name.startswith("_")]
+            key = hashlib.sha256(f"{fn.__name__}{keyed!r}".encode("utf-8")).hexdigest()
+            path = os.path.join(DISK_CACHE_DIR, f"{fn.__name__}-{key}.pkl.z")
+            try:
+                if time.time() - os.path.getmtime(path) < ttl:
+                    with open(path, "rb") as f:
+                        return pickle.loads(zlib.decompress(f.read()))
+            except (OSError, EOFError, zlib.error, pickle.UnpicklingError):
+                pass
+
+            value = fn(*args, **kwargs)
+            prune_disk_cache(fn.__name__, ttl)
+            tmp_path = None
+            try:
+                os.makedirs(DISK_CACHE_DIR, exist_ok=True)
+                # Sessions are threads of one process, so the name must be unique per write
+                fd, tmp_path = tempfile.mkstemp(dir=DISK_CACHE_DIR, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+                os.replace(tmp_path, path)  # atomic, so readers never see partial files
+            except OSError:
+                if tmp_path:
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+            return value
+        return wrapper
+    return decorator
+
+
+def prune_disk_cache(name: str, ttl: int) -> None:
+    """
+    Delete the disk_cached entries of function name that are older than ttl
+    seconds. Missing or busy files are skipped.
+    """
+    cutoff = time.time() - ttl
+    for path in glob.glob(os.path.join(DISK_CACHE_DIR, f"{name}-*.pkl.z")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def clear_disk_cache() -> None:
+    """
+    Delete every entry written by disk_cached. Missing or busy files are skipped.
+    """
+    for path in glob.glob(os.path.join(DISK_CACHE_DIR, "*")):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """
+    Shared HTTP session with keep-alive connection pooling and retries.
+    Throttling (429) and transient 5xx responses are retried with exponential
+    backoff. Retry-After is ignored: these requests run inside the Streamlit
+    script, and a long server-sent delay would stall the page for that long.
+    Cached as a resource so connections survive Streamlit reruns.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=1.0,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            respect_retry_after_header=False,   # bounded backoff only, never a server-chosen sleep
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def video_exists(video_id: str) -> bool:
+    """
+    Cheap existence check before any yt_dlp or transcript API work: YouTube
+    serves a thumbnail for every existing video and a 404 otherwise.
+    Network errors count as "exists" so they never block the real lookups.
+    One attempt only: the shared session's retries and backoff would let a
+    slow img.youtube.com stall the page before any real work starts.
+    """
+    if not BARE_VIDEO_ID_RE.fullmatch(video_id):
+        return False
+    try:
+        r = requests.head(f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg", timeout=3)
+    except requests.RequestException:
+        return True
+    return r.status_code != 404
+
+
 def parse_proxies(proxy_input: str) -> list[str]:
     """
     Convert comma-separated proxy URLs into a list.
@@ -126,36 +335,81 @@ def parse_proxies(proxy_input: str) -> list[str]:
     return [u.strip() for u in proxy_input.split(",") if u.strip()]
 
 
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+@disk_cached(ttl=CACHE_TTL)  # subtitle URLs are signed and expire after a few hours
+def _yt_dlp_subtitle_info(video_id: str) -> dict:
+    """
+    Run yt_dlp extract_info once per video and keep only the subtitle
+    tracks, which is all the transcript helpers need. Shared by language
+    listing and transcript fetching. Raises on failure so errors are not cached.
+    """
+    import yt_dlp  # loads every extractor, so deferred until a video is first looked up
+    ydl_opts = {
+        "skip_download": True,
+        "quiet": True,
+        "no_warnings": True,
+        "extractor_retries": 3,  # yt_dlp backs off between attempts on 429/5xx
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+    return {
+        "subtitles": info.get("subtitles") or {},
+        "automatic_captions": info.get("automatic_captions") or {},
+    }
+
+
+def race_proxies(fn, proxy_list: list[str], *args) -> tuple:
+    """
+    Call fn(*args, proxy_cfg) for every proxy concurrently and return
+    (result, proxy_cfg) for the first truthy result, or (None, None).
+    A None entry in proxy_list means a direct attempt (proxy_cfg=None).
+    fn must not raise or use Streamlit (it runs in worker threads).
+    Slower attempts are abandoned rather than waited for.
+    """
+    ex = ThreadPoolExecutor(max_workers=len(proxy_list))
+    try:
+        futures = {}
+        for p in proxy_list:
+            proxy_cfg = {"http": p, "https": p} if p else None
+            futures[ex.submit(fn, *args, proxy_cfg)] = proxy_cfg
+        for fut in as_completed(futures):
+            result = fut.result()
+            if result:
+                return result, futures[fut]
+        return None, None
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
+
+
 def list_languages_yt_dlp(video_id: str) -> dict:
     """
     Use yt_dlp to extract available subtitle language codes (manual + auto).
     Returns a dict {language_code: "manual"/"auto"}.
     """
     try:
-        ydl_opts = {
-            "skip_download": True,
-            "quiet": True,
-            "no_warnings": True,
-        }
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
-
-            langs: dict[str, str] = {}
+        info = _yt_dlp_subtitle_info(video_id)
+    except Exception:
+        return {}
 
-            # 1) Manual subtitles (info["subtitles"])
-            subs = info.get("subtitles") or {}
-            for code in subs.keys():
-                langs[code] = "manual"
+    # Manual subtitles first, then automatic captions for languages without one
+    langs = dict.fromkeys(info["subtitles"], "manual")
+    langs.update({code: "auto" for code in info["automatic_captions"] if code not in langs})
+    return langs
 
-            # 2) Automatic captions (info["automatic_captions"])
-            auto = info.get("automatic_captions") or {}
-            for code in auto.keys():
-                if code not in langs:
-                    langs[code] = "auto"
 
-            return langs
-    except Exception:
-        return {}
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+@disk_cached(ttl=CACHE_TTL)
+def _cached_api_languages(video_id: str, _found: dict | None = None) -> dict:
+    """
+    Memo of the language lists list_transcript_languages got from the API.
+    Without _found this only looks the video up and raises LookupError on a
+    miss (exceptions are not cached); with the winner of a proxy race it
+    stores that. The proxies race uncached, since a shared cache key would
+    make Streamlit run them one after another.
+    """
+    if _found is None:
+        raise LookupError(f"no cached language list for {video_id}")
+    return _found
 
 
 def try_list_transcripts_api(video_id: str, proxies: dict | None) -> dict:
@@ -172,7 +426,8 @@ def try_list_transcripts_api(video_id: str, proxies: dict | None) -> dict:
 def list_transcript_languages(video_id: str, proxy_list: list[str]) -> tuple[dict, dict | None]:
     """
     1) Attempt to list via yt_dlp first.
-    2) If empty, fall back to YouTubeTranscriptApi (no proxy → each proxy).
+    2) If empty, fall back to YouTubeTranscriptApi, racing a direct attempt
+       against every proxy so a slow direct connection does not hold them up.
     Returns (langs_dict, used_proxy_dict_or_None).
     """
     st.info("Attempting to list languages via yt_dlp…")
@@ -181,73 +436,133 @@ def list_transcript_languages(video_id: str, proxy_list: list[str]) -> tuple[dic
         st.success(f"✓ Languages found via yt_dlp: {', '.join(langs.keys())}")
         return langs, None
 
-    st.info("Falling back to youtube_transcript_api (no proxy)…")
-    langs = try_list_transcripts_api(video_id, None)
-    if langs:
-        st.success("✓ Languages found via API without proxy")
+    try:
+        langs = _cached_api_languages(video_id)
+        st.success(f"✓ Languages found via API (cached): {', '.join(langs.keys())}")
         return langs, None
-
-    for p in proxy_list:
-        proxy_cfg = {"http": p, "https": p}
-        st.info(f"Trying proxy {p} for youtube_transcript_api…")
-        langs = try_list_transcripts_api(video_id, proxy_cfg)
-        if langs:
-            st.success(f"✓ Languages found via API proxy {p}")
-            return langs, proxy_cfg
+    except LookupError:
+        pass
+
+    if proxy_list:
+        st.info(f"Falling back to youtube_transcript_api (no proxy + {len(proxy_list)} proxies in parallel)…")
+    else:
+        st.info("Falling back to youtube_transcript_api (no proxy)…")
+    langs, proxy_cfg = race_proxies(try_list_transcripts_api, [None, *proxy_list], video_id)
+    if langs:
+        _cached_api_languages(video_id, _found=langs)
+        if proxy_cfg:
+            st.success(f"✓ Languages found via API proxy {proxy_cfg['https']}")
+        else:
+            st.success("✓ Languages found via API without proxy")
+        return langs, proxy_cfg
 
     st.error("✗ Unable to list transcript languages (yt_dlp + API all failed)")
     return {}, None
 
 
+def vtt_lines_to_text(rows) -> str:
+    """
+    Strip the WEBVTT header block, cue timing lines, inline tags and blank
+    lines from the rows of a VTT document, keeping only the caption text.
+    Auto-captions repeat each line as it rolls across cues, so consecutive
+    duplicates are dropped. rows may be any iterable of lines (e.g. a
+    streamed HTTP response), consumed in a single pass.
+    """
+    rows = (row.rstrip("\r\n") for row in rows)
+    first = next(rows, "")
+    if first.lstrip("\ufeff").startswith("WEBVTT"):
+        # The header (WEBVTT, Kind:, Language:) ends at the first blank line
+        for row in rows:
+            if not row:
+                break
+    else:
+        rows = itertools.chain([first], rows)
+
+    lines = []
+    prev = None
+    for row in rows:
+        # A plain substring test catches every cue timing form (with or without hours)
+        if "-->" in row:
+            continue
+        line = VTT_TAG_RE.sub("", row).strip() if "<" in row else row.strip()
+        if line and line != prev:
+            lines.append(line)
+            prev = line
+    return "\n".join(lines)
+
+
+def vtt_to_text(vtt_text: str) -> str:
+    """
+    Extract the caption text from a whole VTT document (see vtt_lines_to_text).
+    """
+    return vtt_lines_to_text(io.StringIO(vtt_text))
+
+
+def subtitle_url(info: dict, lang: str) -> str | None:
+    """
+    Pick the subtitle URL for lang from yt_dlp subtitle info, preferring
+    manual subtitles over automatic captions and the VTT rendition over
+    other formats. Returns None if unavailable.
+    """
+    # 1) Check manual subtitles, 2) then automatic captions
+    for kind in ("subtitles", "automatic_captions"):
+        tracks = (info.get(kind) or {}).get(lang)
+        if tracks:
+            track = next((t for t in tracks if t.get("ext") == "vtt"), tracks[0])
+            return track.get("url")
+    return None
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+@disk_cached(ttl=DISK_CACHE_TTL)
+def _fetch_transcript_yt_dlp(video_id: str, lang: str) -> str:
+    """
+    Cached worker for fetch_transcript_yt_dlp. Raises on failure.
+    """
+    vtt_url = subtitle_url(_yt_dlp_subtitle_info(video_id), lang)
+    if not vtt_url:
+        return ""
+
+    # Stream the VTT file and strip timing cues as lines arrive
+    with get_http_session().get(vtt_url, timeout=10, stream=True) as r:
+        r.raise_for_status()
+        r.encoding = "utf-8"  # WebVTT is always UTF-8; text/vtt often omits the charset
+        return vtt_lines_to_text(r.iter_lines(decode_unicode=True))
+
+
 def fetch_transcript_yt_dlp(video_id: str, lang: str) -> str:
     """
     Use yt_dlp to download .vtt/.srt for the given language.
     Returns joined text or '' if nothing found.
     """
     try:
-        ydl_opts = {
-            "skip_download": True,
-            "writesubtitles": True,
-            "subtitleslangs": [lang],
-            "subtitlesformat": "vtt",
-            "quiet": True,
-            "no_warnings": True,
-        }
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
-
-            # 1) Check manual subtitles
-            subs = info.get("subtitles") or {}
-            if lang in subs:
-                vtt_url = subs[lang][0].get("url")
-            else:
-                # 2) Check automatic captions
-                auto = info.get("automatic_captions") or {}
-                if lang in auto:
-                    vtt_url = auto[lang][0].get("url")
-                else:
-                    return ""
-
-            # Download the VTT file and strip timing cues
-            r = requests.get(vtt_url, timeout=10)
-            vtt_text = r.text
-            lines = []
-            for row in vtt_text.splitlines():
-                if row.startswith("WEBVTT") or re.match(r"^\d\d:\d\d:\d\d\.\d\d\d -->", row):
-                    continue
-                lines.append(row)
-            return "\n".join(lines).strip()
+        return _fetch_transcript_yt_dlp(video_id, lang)
     except Exception:
         return ""
 
 
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+@disk_cached(ttl=DISK_CACHE_TTL)
+def _cached_api_transcript(video_id: str, lang: str, _found: str | None = None) -> str:
+    """
+    Memo of the transcripts fetch_transcript_with_fallback got from the API;
+    looked up and stored like _cached_api_languages, so the proxy race
+    itself runs uncached and in parallel.
+    """
+    if _found is None:
+        raise LookupError(f"no cached {lang} transcript for {video_id}")
+    return _found
+
+
 def try_fetch_transcript_api(video_id: str, lang: str, proxies: dict | None) -> str:
     """
     Try YouTubeTranscriptApi.get_transcript(...). Return raw text or '' if it fails.
     """
     try:
         entries = YouTubeTranscriptApi.get_transcript(video_id, languages=[lang], proxies=proxies)
-        return "\n".join(e.get("text", "") for e in entries)
+        # A list (not a generator) lets str.join size the result in one pass;
+        # empty entries would only add blank lines
+        return "\n".join([e["text"] for e in entries if e.get("text")])
     except (TranscriptsDisabled, NoTranscriptFound, Exception):
         return ""
 
@@ -255,7 +570,8 @@ def try_fetch_transcript_api(video_id: str, lang: str, proxies: dict | None) ->
 def fetch_transcript_with_fallback(video_id: str, lang: str, proxy_list: list[str]) -> tuple[str, dict | None]:
     """
     1) Attempt to fetch via yt_dlp.
-    2) If empty, fall back to YouTubeTranscriptApi (no proxy → each proxy).
+    2) If empty, fall back to YouTubeTranscriptApi, racing a direct attempt
+       against every proxy so a slow direct connection does not hold them up.
     Returns (transcript_text, used_proxy_dict_or_None).
     """
     st.info("Attempting to fetch transcript via yt_dlp…")
@@ -264,90 +580,507 @@ def fetch_transcript_with_fallback(video_id: str, lang: str, proxy_list: list[st
         st.success("✓ Fetched transcript via yt_dlp")
         return text, None
 
-    st.info("Falling back to youtube_transcript_api (no proxy)…")
-    text = try_fetch_transcript_api(video_id, lang, None)
-    if text:
-        st.success("✓ Fetched transcript via API without proxy")
+    try:
+        text = _cached_api_transcript(video_id, lang)
+        st.success("✓ Fetched transcript via API (cached)")
         return text, None
-
-    for p in proxy_list:
-        proxy_cfg = {"http": p, "https": p}
-        st.info(f"Trying proxy {p} for get_transcript API…")
-        text = try_fetch_transcript_api(video_id, lang, proxy_cfg)
-        if text:
-            st.success(f"✓ Fetched transcript via API proxy {p}")
-            return text, proxy_cfg
+    except LookupError:
+        pass
+
+    if proxy_list:
+        st.info(f"Falling back to get_transcript API (no proxy + {len(proxy_list)} proxies in parallel)…")
+    else:
+        st.info("Falling back to youtube_transcript_api (no proxy)…")
+    text, proxy_cfg = race_proxies(try_fetch_transcript_api, [None, *proxy_list], video_id, lang)
+    if text:
+        _cached_api_transcript(video_id, lang, _found=text)
+        if proxy_cfg:
+            st.success(f"✓ Fetched transcript via API proxy {proxy_cfg['https']}")
+        else:
+            st.success("✓ Fetched transcript via API without proxy")
+        return text, proxy_cfg
 
     st.error("✗ Unable to fetch transcript (yt_dlp + API all failed)")
     return "", None
 
 
-def summarize_chunk(text: str, lang: str) -> str:
+@st.cache_resource
+def get_token_encoding():
     """
-    Send a single chunk to OpenAI to summarize.
+    Load the tiktoken encoding used to measure chunks, or None if tiktoken
+    is not installed or its encoding file cannot be loaded.
+    cl100k_base only approximates the Llama tokenizer, which is close
+    enough for sizing chunks.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def boundary_cut(text: str, start: int, end: int) -> int:
+    """
+    Pick where a chunk spanning text[start:end] should end: just past the
+    last paragraph, sentence, line or word break in its final 5%, so chunks
+    do not stop mid-sentence. Returns end when there is no break there.
+    Whitespace after a break is left for the next chunk, where tokenizers
+    attach it to the following word.
+    """
+    floor = end - (end - start) // 20
+    for sep, keep in (("\n\n", 2), (". ", 1), ("? ", 1), ("! ", 1), ("\n", 1), (" ", 0)):
+        i = text.rfind(sep, floor, end)
+        if i > start:
+            return i + keep
+    return end
+
+
+def split_transcript(transcript: str) -> list[str]:
+    """
+    Split the transcript into chunks of at most CHUNK_TOKENS tokens, ending
+    each chunk at a nearby sentence or paragraph break (see boundary_cut).
+    Without a tokenizer, falls back to CHUNK_SIZE-character chunks.
+    """
+    enc = get_token_encoding()
+    if enc is None:
+        chunks = []
+        start = 0
+        while len(transcript) - start > CHUNK_SIZE:
+            end = boundary_cut(transcript, start, start + CHUNK_SIZE)
+            chunks.append(transcript[start:end])
+            start = end
+        chunks.append(transcript[start:])
+        return chunks
+
+    tokens = enc.encode(transcript, disallowed_special=())
+    if len(tokens) <= CHUNK_TOKENS:
+        return [transcript]
+    chunks = []
+    pos = 0
+    while len(tokens) - pos > CHUNK_TOKENS:
+        piece = enc.decode(tokens[pos : pos + CHUNK_TOKENS])
+        kept = piece[: boundary_cut(piece, 0, len(piece))]
+        n = len(enc.encode(kept, disallowed_special=()))
+        # Keep the cut only if it falls on a token boundary, so no text is lost or repeated
+        if 0 < n < CHUNK_TOKENS and enc.decode(tokens[pos : pos + n]) == kept:
+            piece = kept
+        else:
+            n = CHUNK_TOKENS
+        chunks.append(piece)
+        pos += n
+    chunks.append(enc.decode(tokens[pos:]))
+    return chunks
+
+
+def fits_one_chunk(transcript: str) -> bool:
+    """
+    True when split_transcript keeps the transcript as one chunk: at most
+    CHUNK_TOKENS tokens, or CHUNK_SIZE characters without a tokenizer.
+    Counted in tokens because CJK text has far more tokens per character.
+    """
+    enc = get_token_encoding()
+    if enc is None:
+        return len(transcript) <= CHUNK_SIZE
+    return len(enc.encode(transcript, disallowed_special=())) <= CHUNK_TOKENS
+
+
+def summary_prompt(text: str | list[str], lang: str) -> str:
+    """
+    Build the prompt used to summarize a transcript chunk. A list of parts
+    (e.g. chunk summaries to combine) is written newline-separated straight
+    into the prompt buffer instead of being joined into an extra copy first.
+    """
+    buf = io.StringIO()
+    buf.write(f"Please summarize the following transcript chunk in {lang}:\n\n")
+    if isinstance(text, str):
+        buf.write(text)
+    else:
+        for n, part in enumerate(text):
+            if n:
+                buf.write("\n")
+            buf.write(part)
+    return buf.getvalue()
+
+
+def stream_chat(prompt: str):
     """
-    prompt = f"Please summarize the following transcript chunk in {lang}:\n\n{text}"
+    Yield the model's reply to prompt as text deltas, for st.write_stream.
+    Raises openai.APIError on API errors, including a connection that drops
+    mid-stream (the SDK only wraps transport errors raised before the first
+    chunk), so callers need a single except clause.
+    """
+    stream = get_client().chat.completions.create(
+        model=MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        stream=True,
+    )
     try:
-        resp = client.chat.completions.create(
-            model="Meta-Llama-4-Maverick-17B-128E-Instruct-FP8",
-            messages=[{"role": "user", "content": prompt}],
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except httpx.HTTPError as e:   # e.g. ReadTimeout, RemoteProtocolError
+        raise openai.APIConnectionError(
+            message=f"Connection lost while streaming: {e}", request=stream.response.request
+        ) from e
+
+
+def chat(prompt: str, stream: bool = False) -> str:
+    """
+    Send prompt as one user message and return the reply text.
+    With stream=True the reply is rendered live as tokens arrive.
+    Raises on API errors.
+    """
+    if stream:
+        return st.write_stream(stream_chat(prompt))
+    resp = get_client().chat.completions.create(
+        model=MODEL,
+        messages=[{"role": "user", "content": prompt}],
+    )
+    return resp.choices[0].message.content
+
+
+def show_api_error(label: str, e: openai.APIError) -> None:
+    """
+    Report an OpenAI API error that persisted through the SDK's own retries.
+    Call from an except block so the traceback can be shown.
+    """
+    if isinstance(e, openai.RateLimitError):
+        st.error(
+            f"{label}: rate limit still exceeded after retries. Wait a minute and "
+            "try again, or use the Batch API option for long summaries."
         )
-        return resp.choices[0].message.content
-    except Exception as e:
-        st.error(f"Summarization error: {e}")
-        st.text(traceback.format_exc())
+        return
+    st.error(f"{label}: {e}")
+    import traceback  # only needed on the error path
+    st.text(traceback.format_exc())
+
+
+def summarize_chunk(text: str | list[str], lang: str, stream: bool = False) -> str:
+    """
+    Send a single chunk to OpenAI to summarize.
+    With stream=True the summary is rendered live as tokens arrive.
+    """
+    try:
+        return chat(summary_prompt(text, lang), stream=stream)
+    except openai.APIError as e:
+        show_api_error("Summarization error", e)
         return ""
 
 
+async def summarize_chunks_async(chunks: list[str | list[str]], lang: str) -> list:
+    """
+    Summarize all chunks concurrently on one event loop, with at most
+    OPENAI_CONCURRENCY requests in flight. A chunk may also be a list of
+    parts to combine (see summary_prompt). Returns one entry per chunk, in
+    order: the summary text, or the exception raised for that chunk.
+    No Streamlit calls happen here; callers report failures.
+    """
+    sem = asyncio.Semaphore(OPENAI_CONCURRENCY)
+    # The async client is bound to the running loop, so it lives for this call only
+    async with openai.AsyncOpenAI(**OPENAI_CLIENT_OPTIONS) as aclient:
+
+        async def summarize_one(text: str | list[str]) -> str:
+            async with sem:
+                resp = await aclient.chat.completions.create(
+                    model=MODEL,
+                    messages=[{"role": "user", "content": summary_prompt(text, lang)}],
+                )
+                return resp.choices[0].message.content
+
+        return await asyncio.gather(*(summarize_one(c) for c in chunks), return_exceptions=True)
+
+
+def summarize_chunks_packed(chunks: list[str], lang: str) -> list[str] | str:
+    """
+    Summarize all chunks with ONE chat completion using JSON output.
+    Returns the unified summary (str) when the model provides one, otherwise
+    the list of per-chunk summaries. Raises on API or parse errors.
+    """
+    numbered = "\n\n".join(
+        f"<chunk {n}>\n{text}\n</chunk {n}>" for n, text in enumerate(chunks, start=1)
+    )
+    prompt = (
+        f"The transcript below is split into {len(chunks)} numbered chunks. "
+        f"Summarize it in {lang}. Respond with a JSON object of the form "
+        '{"chunk_summaries": ["<summary of chunk 1>", ...], '
+        '"summary": "<one unified summary of the whole transcript>"}'
+        f"\n\n{numbered}"
+    )
+    resp = get_client().chat.completions.create(
+        model=MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+    )
+    data = json.loads(resp.choices[0].message.content)
+
+    summary = data.get("summary")
+    if isinstance(summary, str) and summary.strip():
+        return summary
+    parts = data.get("chunk_summaries")
+    if isinstance(parts, list) and parts and all(isinstance(p, str) for p in parts):
+        return parts
+    raise ValueError("response did not contain 'summary' or 'chunk_summaries'")
+
+
+def build_summary(transcript: str, lang: str) -> str:
+    """
+    Break transcript into chunks and summarize them. Transcripts that fit in
+    the model context are packed into a single request; longer ones (or a
+    failed packed request) fall back to concurrent per-chunk requests
+    followed by a summary of the combined chunk summaries (see
+    merge_summaries). The final summary call is streamed to the page.
+    Returns '' (with the errors shown) if any chunk fails, rather than a
+    summary of only part of the transcript.
+    """
+    chunks = split_transcript(transcript)
+    if len(chunks) == 1:
+        return summarize_chunk(transcript, lang, stream=True)
+
+    if len(chunks) * CHUNK_TOKENS <= MODEL_CONTEXT_TOKENS:
+        try:
+            packed = summarize_chunks_packed(chunks, lang)
+            if isinstance(packed, str):
+                return packed
+            return summarize_chunk(packed, lang, stream=True)
+        except Exception as e:
+            st.warning(f"⚠️ Single-request summary failed ({e}). Summarizing chunks separately...")
+
+    results = asyncio.run(summarize_chunks_async(chunks, lang))
+    failed = [(n, r) for n, r in enumerate(results, start=1) if isinstance(r, Exception)]
+    if failed:
+        # A summary missing part of the video would be cached as if complete, so fail instead
+        for n, result in failed:
+            st.error(f"Summarization error: chunk {n}/{len(chunks)} failed ({result})")
+        st.error(f"{len(failed)} of {len(chunks)} transcript chunks could not be summarized. Please try again.")
+        return ""
+    return merge_summaries(results, lang)
+
+
+def merge_summaries(parts: list[str], lang: str) -> str:
+    """
+    Combine chunk summaries into one summary. More than MERGE_FANIN of them
+    are merged concurrently in groups, level by level, so no single request
+    has to hold all of them; the final call is streamed to the page.
+    Returns '' if that final call fails (the error is shown).
+    """
+    if len(parts) == 1:
+        return parts[0]  # nothing to combine
+
+    while len(parts) > MERGE_FANIN:
+        groups = [parts[i : i + MERGE_FANIN] for i in range(0, len(parts), MERGE_FANIN)]
+        results = asyncio.run(summarize_chunks_async(groups, lang))
+        parts = []
+        for group, result in zip(groups, results):
+            if isinstance(result, Exception):
+                st.warning(f"⚠️ Merging {len(group)} chunk summaries failed ({result}); keeping them as is")
+                parts.append("\n".join(group))
+            else:
+                parts.append(result)
+    return summarize_chunk(parts, lang, stream=True)
+
+
+@st.cache_data(ttl=LLM_CACHE_TTL, show_spinner=False)
+@disk_cached(ttl=LLM_CACHE_TTL)
+def _cached_summary(digest: str, lang: str, _transcript: str = "") -> str:
+    """
+    Cached worker for summarize_transcript, keyed on the transcript digest
+    (the leading underscore keeps the full text out of both Streamlit's hash
+    and the disk cache key).
+    Raises on an empty result so failures are not cached.
+    """
+    summary = build_summary(_transcript, lang)
+    if not summary:
+        raise RuntimeError("summarization produced no output")
+    return summary
+
+
 def summarize_transcript(transcript: str, lang: str) -> str:
     """
-    Break transcript into chunks and summarize iteratively.
+    Summarize the transcript, reusing a cached summary when the same
+    transcript text was already summarized in this language.
     """
-    if len(transcript) <= CHUNK_SIZE:
-        return summarize_chunk(transcript, lang)
-    parts = []
-    for i in range(0, len(transcript), CHUNK_SIZE):
-        parts.append(summarize_chunk(transcript[i : i + CHUNK_SIZE], lang))
-    return summarize_chunk("\n".join(parts), lang)
+    digest = hashlib.blake2b(transcript.encode("utf-8"), digest_size=16).hexdigest()
+    try:
+        return _cached_summary(digest, lang, _transcript=transcript)
+    except RuntimeError:
+        return ""
+
+
+def submit_summary_batch(transcript: str, lang: str) -> str:
+    """
+    Queue the per-chunk summaries on the OpenAI Batch API (cheaper, but may
+    take up to 24h). Returns the batch id; raises on API errors.
+    """
+    buf = io.StringIO()
+    for n, chunk in enumerate(split_transcript(transcript)):
+        request = {
+            "custom_id": f"chunk-{n}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": MODEL,
+                "messages": [{"role": "user", "content": summary_prompt(chunk, lang)}],
+            },
+        }
+        buf.write(json.dumps(request) + "\n")
+    batch_file = get_client().files.create(
+        file=("summary_chunks.jsonl", buf.getvalue().encode("utf-8")), purpose="batch"
+    )
+    batch = get_client().batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    return batch.id
 
 
-def generate_quiz(summary: str, lang: str, grade: str, num_questions: int) -> str:
+def collect_summary_batch(batch_id: str, lang: str) -> tuple[str, str]:
     """
-    Ask the model to create a multiple-choice quiz based on the summary.
+    Check a batch queued by submit_summary_batch. Once it has completed,
+    combine the chunk summaries (streamed live) and return (summary, status);
+    while it is still running the summary is ''. Raises RuntimeError when the
+    batch can never produce a summary (failed, expired, cancelled, or nothing
+    usable came back), and openai.APIError on API errors.
+    """
+    batch = get_client().batches.retrieve(batch_id)
+    if batch.status in BATCH_FAILED_STATUSES:
+        raise RuntimeError(f"the batch ended as {batch.status}")
+    if batch.status != "completed":
+        return "", batch.status
+    if not batch.output_file_id:
+        raise RuntimeError("every request in the batch failed")
+
+    results = {}
+    for line in get_client().files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        response = row.get("response") or {}
+        if response.get("status_code") == 200:
+            n = int(row["custom_id"].rsplit("-", 1)[1])
+            results[n] = response["body"]["choices"][0]["message"]["content"]
+    if not results:
+        raise RuntimeError("every request in the batch failed")
+    total = getattr(batch.request_counts, "total", 0) or len(results)
+    if len(results) < total:
+        raise RuntimeError(f"{total - len(results)} of {total} chunk requests in the batch failed")
+
+    summary = merge_summaries([results[n] for n in sorted(results)], lang)
+    if not summary:
+        raise RuntimeError("combining the chunk summaries failed")
+    return summary, batch.status
+
+
+def build_quiz(
+    text: str, lang: str, grade: str, num_questions: int, stream: bool = False, source: str = "summary"
+) -> str:
+    """
+    Ask the model to create a multiple-choice quiz based on text, which is
+    the video summary or, for short videos, the transcript itself (source).
+    A transcript quiz also asks for a summary in the same reply, under
+    SUMMARY/QUIZ headings (see split_summary_and_quiz), saving the separate
+    summary request. With stream=True the reply is rendered live as tokens arrive.
     """
     prompt = (
         f"Create a {num_questions}-question multiple-choice quiz in {lang} "
-        f"for grade {grade} students based on this summary:\n\n{summary}"
+        f"for grade {grade} students based on this {source}:\n\n{text}"
     )
-    try:
-        resp = client.chat.completions.create(
-            model="Meta-Llama-4-Maverick-17B-128E-Instruct-FP8",
-            messages=[{"role": "user", "content": prompt}],
+    if source == "transcript":
+        prompt = (
+            f"Read the transcript below. First write a summary of it in {lang} under "
+            f"a line containing only SUMMARY:, then a {num_questions}-question "
+            f"multiple-choice quiz in {lang} for grade {grade} students under a line "
+            f"containing only QUIZ:. Keep these two headings in English exactly as "
+            f"written, even though the rest of the reply is in {lang}.\n\n{text}"
         )
-        return resp.choices[0].message.content
-    except Exception as e:
-        st.error(f"Quiz generation error: {e}")
-        st.text(traceback.format_exc())
+    try:
+        return chat(prompt, stream=stream)
+    except openai.APIError as e:
+        show_api_error("Quiz generation error", e)
         return ""
 
 
-def modify_quiz(existing_quiz: str, instructions: str, lang: str) -> str:
+def split_summary_and_quiz(reply: str) -> tuple[str, str]:
+    """
+    Split a combined reply from build_quiz(source="transcript") into
+    (summary, quiz). Headings match in any case. Without a QUIZ heading the
+    whole reply is the quiz, unless it starts under a SUMMARY heading: then
+    it is all summary and the quiz is '' (a truncated or incomplete reply).
+    """
+    match = QUIZ_HEADING_RE.search(reply)
+    if not match:
+        summary_match = SUMMARY_HEADING_RE.match(reply.lstrip())
+        if summary_match:
+            return reply.lstrip()[summary_match.end() :].strip(), ""
+        return "", reply.strip()
+    summary = SUMMARY_HEADING_RE.sub("", reply[: match.start()], count=1)
+    return summary.strip(), reply[match.end() :].strip()
+
+
+@st.cache_data(ttl=LLM_CACHE_TTL, max_entries=128, show_spinner=False)
+@disk_cached(ttl=LLM_CACHE_TTL)
+def _cached_quiz(text: str, lang: str, grade: str, num_questions: int, stream: bool, source: str) -> str:
+    """
+    Cached worker for generate_quiz. Raises on an empty result (or, for a
+    combined transcript reply, an empty quiz part) so failures are not cached.
+    """
+    quiz = build_quiz(text, lang, grade, num_questions, stream=stream, source=source)
+    if not quiz or (source == "transcript" and not split_summary_and_quiz(quiz)[1]):
+        raise RuntimeError("quiz generation produced no output")
+    return quiz
+
+
+def generate_quiz(
+    text: str, lang: str, grade: str, num_questions: int, stream: bool = False, source: str = "summary"
+) -> str:
+    """
+    Create a quiz for the summary (or a short transcript, see build_quiz),
+    reusing the cached quiz for identical settings so reruns do not repeat
+    the request.
+    """
+    try:
+        return _cached_quiz(text, lang, grade, num_questions, stream, source)
+    except RuntimeError:
+        return ""
+
+
+def build_modified_quiz(existing_quiz: str, instructions: str, lang: str, stream: bool = False) -> str:
     """
     Ask the model to modify the existing quiz as per user instructions.
+    With stream=True the modified quiz is rendered live as tokens arrive.
     """
     prompt = (
         f"Modify this quiz in {lang} as follows: {instructions}\n\n"
         f"Current quiz:\n{existing_quiz}"
     )
     try:
-        resp = client.chat.completions.create(
-            model="Meta-Llama-4-Maverick-17B-128E-Instruct-FP8",
-            messages=[{"role": "user", "content": prompt}],
-        )
-        return resp.choices[0].message.content
-    except Exception as e:
-        st.error(f"Quiz modification error: {e}")
-        st.text(traceback.format_exc())
+        return chat(prompt, stream=stream)
+    except openai.APIError as e:
+        show_api_error("Quiz modification error", e)
+        return ""
+
+
+@st.cache_data(ttl=LLM_CACHE_TTL, max_entries=128, show_spinner=False)
+@disk_cached(ttl=LLM_CACHE_TTL)
+def _cached_modified_quiz(existing_quiz: str, instructions: str, lang: str, stream: bool) -> str:
+    """
+    Cached worker for modify_quiz. Raises on an empty result so failures are not cached.
+    """
+    modified = build_modified_quiz(existing_quiz, instructions, lang, stream=stream)
+    if not modified:
+        raise RuntimeError("quiz modification produced no output")
+    return modified
+
+
+def modify_quiz(existing_quiz: str, instructions: str, lang: str, stream: bool = False) -> str:
+    """
+    Modify the quiz as instructed, reusing the cached result when the same
+    instructions were already applied to the same quiz.
+    """
+    try:
+        return _cached_modified_quiz(existing_quiz, instructions, lang, stream)
+    except RuntimeError:
         return ""
 
 
@@ -404,6 +1137,8 @@ def create_enhanced_ydl_opts(video_id: str, use_cookies: str = "none", cookie_fi
         "socket_timeout": 30,
         "retries": 3,
         "format": format_selector,
+        # Download in bounded 10MB ranges; keeps memory flat and avoids YouTube throttling long streams
+        "http_chunk_size": 10 * 1024 * 1024,
         
         # Enhanced user agent
         "user_agent": selected_user_agent,
@@ -454,7 +1189,23 @@ def create_enhanced_ydl_opts(video_id: str, use_cookies: str = "none", cookie_fi
         ydl_opts["cookiefile"] = cookie_file
     
     return ydl_opts
-def get_video_formats(video_id: str, use_cookies: str = "none", cookie_file: str = None) -> list[dict]:
+
+
+def direct_media_url(fmt: dict) -> str | None:
+    """
+    The googlevideo URL of a yt_dlp format when it is a single file the
+    browser can fetch itself (with resumable Range requests), or None for
+    HLS/DASH manifests. The URL is signed for the IP that resolved it and
+    expires after a few hours.
+    """
+    if fmt.get("protocol") in ("http", "https"):
+        return fmt.get("url")
+    return None
+
+
+def get_video_formats(
+    video_id: str, use_cookies: str = "none", cookie_file: str = None, messages: list | None = None
+) -> list[dict]:
     """
     Get available video formats for download using yt_dlp.
     Returns a list of format dictionaries with enhanced 403 error handling.
@@ -463,7 +1214,18 @@ def get_video_formats(video_id: str, use_cookies: str = "none", cookie_file: str
         video_id: YouTube video ID  
         use_cookies: Browser to extract cookies from ("none", "chrome", "firefox", etc.)
         cookie_file: Path to cookie file (optional)
+        messages: When given, warnings and errors are appended to it as
+            (kind, text) pairs instead of being shown, so the call can run
+            off the script thread (see probe_video_formats)
     """
+    import yt_dlp  # deferred, see _yt_dlp_subtitle_info
+    
+    def show(kind: str, text: str) -> None:
+        if messages is None:
+            getattr(st, kind)(text)
+        else:
+            messages.append((kind, text))
+    
     # Primary attempt with enhanced configuration
     try:
         ydl_opts = create_enhanced_ydl_opts(video_id, use_cookies, cookie_file, "best")
@@ -471,7 +1233,7 @@ def get_video_formats(video_id: str, use_cookies: str = "none", cookie_file: str
             info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
             
             if not info:
-                st.error("❌ Could not retrieve video information.")
+                show("error", "❌ Could not retrieve video information.")
                 return []
             
             formats = []
@@ -480,11 +1242,11 @@ def get_video_formats(video_id: str, use_cookies: str = "none", cookie_file: str
             # Check if video is too long or has restrictions
             duration = info.get("duration", 0)
             if duration and duration > 7200:  # More than 2 hours
-                st.warning(f"⚠️ Video is very long ({duration//60} minutes). Consider downloading smaller segments.")
+                show("warning", f"⚠️ Video is very long ({duration//60} minutes). Consider downloading smaller segments.")
             
             availability = info.get("availability")
             if availability and availability != "public":
-                st.warning(f"⚠️ Video availability: {availability}. Download may fail.")
+                show("warning", f"⚠️ Video availability: {availability}. Download may fail.")
             
             for fmt in info.get("formats", []):
                 if fmt.get("vcodec") != "none" and fmt.get("acodec") != "none":  # Video with audio
@@ -508,11 +1270,12 @@ def get_video_formats(video_id: str, use_cookies: str = "none", cookie_file: str
                             "ext": ext,
                             "description": f"{height}p {format_note} (.{ext}){size_mb}",
                             "filesize": filesize,
-                            "tbr": tbr
+                            "tbr": tbr,
+                            "url": direct_media_url(fmt)
                         })
             
-            # Sort by quality (height) descending - handle None values
-            formats.sort(key=lambda x: x["height"] if x["height"] is not None else 0, reverse=True)
+            # Sort by quality (height) descending; formats without a height were skipped above
+            formats.sort(key=itemgetter("height"), reverse=True)
             
             # Add audio-only option
             audio_formats = [fmt for fmt in info.get("formats", []) if fmt.get("vcodec") == "none" and fmt.get("acodec") != "none"]
@@ -520,12 +1283,8 @@ def get_video_formats(video_id: str, use_cookies: str = "none", cookie_file: str
                 # Filter out formats with None abr values before finding the best one
                 valid_audio_formats = [fmt for fmt in audio_formats if fmt.get("abr") is not None and isinstance(fmt.get("abr"), (int, float))]
                 if valid_audio_formats:
-                    # Use safe comparison for abr values
-                    def safe_get_abr(fmt):
-                        abr = fmt.get("abr", 0)
-                        return abr if abr is not None and isinstance(abr, (int, float)) else 0
-                    
-                    best_audio = max(valid_audio_formats, key=safe_get_abr)
+                    # Every remaining format has a numeric abr
+                    best_audio = max(valid_audio_formats, key=itemgetter("abr"))
                 else:
                     # Fallback to first audio format if no valid abr values
                     best_audio = audio_formats[0]
@@ -537,18 +1296,19 @@ def get_video_formats(video_id: str, use_cookies: str = "none", cookie_file: str
                     "ext": best_audio.get("ext", "m4a"),
                     "description": f"Audio Only (.{best_audio.get('ext', 'm4a')}){size_mb}",
                     "filesize": filesize,
-                    "tbr": best_audio.get("abr", 0)
+                    "tbr": best_audio.get("abr", 0),
+                    "url": direct_media_url(best_audio)
                 })
             
             if not formats:
-                st.error("❌ No suitable formats found for this video.")
+                show("error", "❌ No suitable formats found for this video.")
             
             return formats
     except yt_dlp.utils.DownloadError as e:
         error_msg = str(e)
         if "403" in error_msg or "Forbidden" in error_msg:
             # Try fallback strategy with different configuration
-            st.warning("⚠️ Initial request failed with 403 error. Trying alternative approach...")
+            show("warning", "⚠️ Initial request failed with 403 error. Trying alternative approach...")
             
             try:
                 # Fallback configuration with more conservative settings
@@ -574,7 +1334,7 @@ def get_video_formats(video_id: str, use_cookies: str = "none", cookie_file: str
                     info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
                     
                     if info:
-                        st.info("✅ Successfully retrieved video information with alternative configuration.")
+                        show("info", "✅ Successfully retrieved video information with alternative configuration.")
                         # Process formats using the same logic as above
                         formats = []
                         seen_formats = set()
@@ -582,11 +1342,11 @@ def get_video_formats(video_id: str, use_cookies: str = "none", cookie_file: str
                         # Check if video is too long or has restrictions
                         duration = info.get("duration", 0)
                         if duration and duration > 7200:  # More than 2 hours
-                            st.warning(f"⚠️ Video is very long ({duration//60} minutes). Consider downloading smaller segments.")
+                            show("warning", f"⚠️ Video is very long ({duration//60} minutes). Consider downloading smaller segments.")
                         
                         availability = info.get("availability")
                         if availability and availability != "public":
-                            st.warning(f"⚠️ Video availability: {availability}. Download may fail.")
+                            show("warning", f"⚠️ Video availability: {availability}. Download may fail.")
                         
                         for fmt in info.get("formats", []):
                             if fmt.get("vcodec") != "none" and fmt.get("acodec") != "none":  # Video with audio
@@ -609,7 +1369,8 @@ def get_video_formats(video_id: str, use_cookies: str = "none", cookie_file: str
                                         "ext": ext,
                                         "description": f"{quality_desc} (.{ext}){size_mb}",
                                         "filesize": filesize,
-                                        "tbr": tbr
+                                        "tbr": tbr,
+                                        "url": direct_media_url(fmt)
                                     })
                         
                         # Add audio-only format
@@ -618,12 +1379,8 @@ def get_video_formats(video_id: str, use_cookies: str = "none", cookie_file: str
                             # Filter out formats with None abr values before finding the best one
                             valid_audio_formats = [fmt for fmt in audio_formats if fmt.get("abr") is not None and isinstance(fmt.get("abr"), (int, float))]
                             if valid_audio_formats:
-                                # Use safe comparison for abr values
-                                def safe_get_abr(fmt):
-                                    abr = fmt.get("abr", 0)
-                                    return abr if abr is not None and isinstance(abr, (int, float)) else 0
-                                
-                                best_audio = max(valid_audio_formats, key=safe_get_abr)
+                                # Every remaining format has a numeric abr
+                                best_audio = max(valid_audio_formats, key=itemgetter("abr"))
                             else:
                                 # Fallback to first audio format if no valid abr values
                                 best_audio = audio_formats[0]
@@ -635,35 +1392,273 @@ def get_video_formats(video_id: str, use_cookies: str = "none", cookie_file: str
                                 "ext": best_audio.get("ext", "m4a"),
                                 "description": f"Audio Only (.{best_audio.get('ext', 'm4a')}){size_mb}",
                                 "filesize": filesize,
-                                "tbr": best_audio.get("abr", 0)
+                                "tbr": best_audio.get("abr", 0),
+                                "url": direct_media_url(best_audio)
                             })
                         
                         return formats
                     
             except Exception as fallback_error:
-                st.error(f"❌ Fallback attempt also failed: {str(fallback_error)}")
+                show("error", f"❌ Fallback attempt also failed: {str(fallback_error)}")
             
             # If fallback fails, show enhanced error information
-            st.error("❌ Error fetching video formats: HTTP Error 403: Forbidden")
-            st.error("🔒 This video may be:")
-            st.error("• Age-restricted or region-blocked")
-            st.error("• Private or requires authentication")
-            st.error("• Temporarily unavailable")
-            st.error("• Protected by enhanced bot detection")
-            st.error("💡 Troubleshooting tips:")
-            st.error("• Try a different video that's publicly accessible")
-            st.error("• Check if the video plays normally in your browser")
-            st.error("• Some livestreams and premieres may have restrictions")
-            st.error("• Very new videos might need time before download is available")
+            show("error", "❌ Error fetching video formats: HTTP Error 403: Forbidden")
+            show("error", "🔒 This video may be:")
+            show("error", "• Age-restricted or region-blocked")
+            show("error", "• Private or requires authentication")
+            show("error", "• Temporarily unavailable")
+            show("error", "• Protected by enhanced bot detection")
+            show("error", "💡 Troubleshooting tips:")
+            show("error", "• Try a different video that's publicly accessible")
+            show("error", "• Check if the video plays normally in your browser")
+            show("error", "• Some livestreams and premieres may have restrictions")
+            show("error", "• Very new videos might need time before download is available")
         else:
-            st.error(f"❌ Error fetching video formats: {error_msg}")
+            show("error", f"❌ Error fetching video formats: {error_msg}")
         return []
     except Exception as e:
-        st.error(f"❌ Unexpected error getting video formats: {str(e)}")
+        show("error", f"❌ Unexpected error getting video formats: {str(e)}")
         return []
 
 
-def download_video(video_id: str, format_id: str, output_path: str = "/tmp", use_cookies: str = "none", cookie_file: str = None) -> str:
+def probe_video_formats(video_ids: list[str], use_cookies: str = "none", cookie_file: str = None) -> dict:
+    """
+    Run get_video_formats for several videos concurrently and return
+    {video_id: formats}. yt_dlp spends most of a probe waiting on the
+    network, so threads overlap well. Streamlit elements must be created on
+    the script thread, so the workers collect their warnings and errors and
+    they are shown here afterwards, in video order.
+    """
+    def probe(video_id: str) -> tuple[list[dict], list]:
+        messages = []
+        return get_video_formats(video_id, use_cookies, cookie_file, messages), messages
+    
+    with ThreadPoolExecutor(max_workers=min(len(video_ids), DOWNLOAD_PROBE_CONCURRENCY) or 1) as ex:
+        results = list(ex.map(probe, video_ids))
+    
+    formats = {}
+    for video_id, (video_formats, messages) in zip(video_ids, results):
+        for kind, text in messages:
+            getattr(st, kind)(f"{video_id}: {text}" if len(video_ids) > 1 else text)
+        formats[video_id] = video_formats
+    return formats
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _yt_dlp_video_meta(video_id: str) -> dict:
+    """
+    Fetch the title, duration and approximate size download_video needs,
+    once per video (no cookies are involved, so the result is shareable).
+    Raises on failure so errors are not cached.
+    """
+    import yt_dlp  # deferred, see _yt_dlp_subtitle_info
+    ydl_opts_info = {
+        "quiet": True,
+        "no_warnings": True,
+        "socket_timeout": 30,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts_info) as ydl:
+        info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+    return {key: info.get(key) for key in ("title", "duration", "filesize_approx")}
+
+
+@st.cache_resource
+def kept_downloads() -> set[str]:
+    """
+    Paths of finished downloads kept on disk so a repeat click in the same
+    session serves the file again instead of downloading it again. Cached as
+    a resource (one set per server process); keep_download bounds their
+    total size, and the files are removed when the process exits.
+    """
+    paths: set[str] = set()
+
+    def remove_all() -> None:
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    atexit.register(remove_all)
+    return paths
+
+
+def keep_download(path: str) -> None:
+    """
+    Add a finished (or reused) download to kept_downloads and mark it the
+    most recent, then delete the least recently kept files (by mtime) until
+    the rest total at most DOWNLOAD_KEEP_BYTES. path itself is always kept,
+    however large.
+    """
+    paths = kept_downloads()
+    paths.add(path)
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    files = []
+    for kept in list(paths):   # one-step copy; other sessions share the set
+        try:
+            files.append((os.path.getmtime(kept), os.path.getsize(kept), kept))
+        except OSError:
+            paths.discard(kept)   # already gone
+    files.sort(reverse=True)
+
+    total = 0
+    for n, (_, size, kept) in enumerate(files):
+        total += size
+        if n and total > DOWNLOAD_KEEP_BYTES:
+            paths.discard(kept)
+            try:
+                os.remove(kept)
+            except OSError:
+                pass
+
+
+def range_bounds(size: int, parts: int = DOWNLOAD_RANGE_PARTS) -> list[tuple[int, int]]:
+    """
+    Split [0, size) into at most parts inclusive (start, end) byte ranges
+    for Range headers, none smaller than DOWNLOAD_RANGE_MIN_BYTES except the last.
+    """
+    step = max(-(-size // parts), DOWNLOAD_RANGE_MIN_BYTES)
+    return [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+
+
+def prune_partial_downloads(directory: str, max_age: int = DOWNLOAD_PARTIAL_TTL) -> None:
+    """
+    Delete the partial files and progress records download_ranges left in
+    directory more than max_age seconds ago. Missing or busy files are skipped.
+    """
+    cutoff = time.time() - max_age
+    for pattern in ("*.ranges.part", "*.ranges.json"):
+        for path in glob.glob(os.path.join(glob.escape(directory), pattern)):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+def partial_download_paths(path: str, tag: str = "") -> tuple[str, str]:
+    """
+    The (partial file, progress record) paths download_ranges uses for path.
+    Not path + ".part": that is yt_dlp's own resume file for the same output.
+    """
+    stem = f"{path}.{tag}" if tag else path
+    return stem + ".ranges.part", stem + ".ranges.json"
+
+
+def remove_partial_download(path: str, tag: str = "") -> None:
+    """
+    Delete what an unfinished download_ranges left for path, e.g. once
+    yt_dlp has fetched the file instead. Missing files are skipped.
+    """
+    for leftover in partial_download_paths(path, tag):
+        try:
+            os.remove(leftover)
+        except OSError:
+            pass
+
+
+def download_ranges(url: str, path: str, size: int, tag: str = "") -> bool:
+    """
+    Fetch url into path with concurrent Range requests, each writing its
+    slice at its own offset of a preallocated file. googlevideo throttles
+    every connection, so parallel ranges finish well before one stream.
+    If the network drops mid-transfer, up to DOWNLOAD_RANGE_PASSES passes
+    re-request only the missing bytes of each slice. After that the partial
+    file and a progress record stay next to path, and the next call with
+    the same tag resumes them (If-Range makes the server resend the whole
+    file instead if it changed, which discards the partial).
+    tag (e.g. a per-session token) keeps concurrent downloads of the same
+    path from writing into one partial file; partials abandoned for
+    DOWNLOAD_PARTIAL_TTL are deleted on the next call.
+    Returns False if the download did not complete, so callers can fall
+    back to yt_dlp. No Streamlit calls happen here (ranges run in worker threads).
+    """
+    prune_partial_downloads(os.path.dirname(path))
+    part_path, progress_path = partial_download_paths(path, tag)
+    session = get_http_session()
+    bounds = range_bounds(size)
+
+    try:
+        with open(progress_path, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved["size"] != size or os.path.getsize(part_path) != size:
+            raise ValueError("partial download is for a different file")
+        done = {int(start): n for start, n in saved["done"].items()}
+        state = {"validator": saved.get("validator")}
+    except (OSError, ValueError, KeyError):
+        done, state = {}, {"validator": None}   # bytes written per slice start; ETag/Last-Modified
+
+    def fetch(bounds: tuple[int, int]) -> None:
+        start, end = bounds
+        offset = start + done.get(start, 0)
+        if offset > end:
+            return
+        headers = {"Range": f"bytes={offset}-{end}"}
+        if state["validator"]:
+            headers["If-Range"] = state["validator"]
+        with session.get(url, headers=headers, stream=True, timeout=30) as r:
+            if r.status_code == 416:   # nothing left to send for this slice
+                done[start] = end - start + 1
+                return
+            if r.status_code != 206:   # 200 means ranges are unsupported or the file changed
+                raise ValueError(f"Range request answered with HTTP {r.status_code}")
+            state["validator"] = state["validator"] or r.headers.get("ETag") or r.headers.get("Last-Modified")
+            with open(part_path, "r+b") as f:
+                f.seek(offset)
+                for block in r.iter_content(chunk_size=1024 * 1024):
+                    f.write(block)
+                    done[start] = f.tell() - start
+        if done.get(start, 0) != end - start + 1:
+            raise requests.ConnectionError(f"range {start}-{end} ended early")
+
+    try:
+        if not done:
+            with open(part_path, "wb") as f:
+                f.truncate(size)
+        for attempt in range(DOWNLOAD_RANGE_PASSES):
+            try:
+                # Leaving the pool waits for every slice, so done is complete for the next pass
+                with ThreadPoolExecutor(max_workers=len(bounds)) as ex:
+                    list(ex.map(fetch, bounds))
+                break
+            except requests.RequestException:
+                if attempt == DOWNLOAD_RANGE_PASSES - 1:
+                    raise
+                time.sleep(2 ** attempt)   # let a flaky connection settle before resuming
+        os.replace(part_path, path)
+    except requests.RequestException:
+        # Flaky network: keep what arrived so the next attempt resumes
+        with open(progress_path, "w", encoding="utf-8") as f:
+            json.dump({"size": size, "validator": state["validator"], "done": done}, f)
+        return False
+    except (OSError, ValueError):
+        remove_partial_download(path, tag)
+        return False
+    try:
+        os.remove(progress_path)
+    except OSError:
+        pass
+    return True
+
+
+def downloaded_file_path(ydl, info: dict) -> str:
+    """
+    The file ydl.extract_info(..., download=True) wrote for info: its final
+    path after any merge, or the output template filled in for info.
+    """
+    for item in info.get("requested_downloads") or []:
+        if item.get("filepath"):
+            return item["filepath"]
+    return ydl.prepare_filename(info)
+
+
+def download_video(
+    video_id: str, format_id: str, output_path: str = "/tmp", use_cookies: str = "none",
+    cookie_file: str = None, fmt: dict | None = None
+) -> str:
     """
     Download video using yt_dlp with specified format.
     Returns the path to the downloaded file or empty string if failed.
@@ -674,40 +1669,39 @@ def download_video(video_id: str, format_id: str, output_path: str = "/tmp", use
         output_path: Output directory path
         use_cookies: Browser to extract cookies from ("none", "chrome", "firefox", etc.)
         cookie_file: Path to cookie file (optional)
+        fmt: The chosen entry from get_video_formats (optional). When it has a
+            direct URL and a known size, the file is fetched with parallel
+            Range requests first (see download_ranges).
     """
+    import yt_dlp  # deferred, see _yt_dlp_subtitle_info
     try:
         # Ensure output directory exists
         os.makedirs(output_path, exist_ok=True)
         
         # Clean filename
-        ydl_opts_info = {
-            "quiet": True,
-            "no_warnings": True,
-            "socket_timeout": 30,
-        }
+        info = _yt_dlp_video_meta(video_id)
+        title = info.get("title") or video_id
+        duration = info.get("duration", 0)
+        filesize_approx = info.get("filesize_approx", 0)
         
-        with yt_dlp.YoutubeDL(ydl_opts_info) as ydl:
-            info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
-            title = info.get("title", video_id)
-            duration = info.get("duration", 0)
-            filesize_approx = info.get("filesize_approx", 0)
-            
-            # Validate video duration and size
-            if duration and duration > 3600:  # More than 1 hour
-                st.warning(f"⚠️ Video is {duration//60} minutes long. Download may take a while.")
-            
-            if filesize_approx and filesize_approx > 500 * 1024 * 1024:  # More than 500MB
-                st.warning(f"⚠️ Video is approximately {filesize_approx//(1024*1024)} MB. Download may take a while.")
-            
-            # Clean title for filename - more robust sanitization
-            valid_chars = "-_.() %s%s" % (string.ascii_letters, string.digits)
-            clean_title = ''.join(c for c in title if c in valid_chars).strip()
-            clean_title = clean_title[:50]  # Limit length
-            if not clean_title:  # Fallback if title becomes empty
-                clean_title = f"video_{video_id[:8]}"
+        # Validate video duration and size
+        if duration and duration > 3600:  # More than 1 hour
+            st.warning(f"⚠️ Video is {duration//60} minutes long. Download may take a while.")
+        
+        if filesize_approx and filesize_approx > 500 * 1024 * 1024:  # More than 500MB
+            st.warning(f"⚠️ Video is approximately {filesize_approx//(1024*1024)} MB. Download may take a while.")
+        
+        # Clean title for filename
+        safe_title = sanitize_title(title, video_id)
+        
+        # Single-file formats of known size come straight from the CDN in parallel ranges
+        direct_path = None
+        if fmt and fmt.get("url") and fmt.get("filesize"):
+            direct_path = os.path.join(output_path, f"{safe_title}_{format_id}.{fmt.get('ext', 'mp4')}")
+            if download_ranges(fmt["url"], direct_path, fmt["filesize"], st.session_state.download_token):
+                return direct_path
         
         # Use enhanced ydl options with cookie support  
-        safe_title = re.sub(r'[<>:"/\\|?*]', '_', clean_title)
         output_template = os.path.join(output_path, f"{safe_title}_%(format_id)s.%(ext)s")
         
         # Primary download attempt with enhanced configuration
@@ -716,7 +1710,9 @@ def download_video(video_id: str, format_id: str, output_path: str = "/tmp", use
         
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             try:
-                ydl.download([f"https://www.youtube.com/watch?v={video_id}"])
+                downloaded = downloaded_file_path(
+                    ydl, ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=True)
+                )
             except yt_dlp.utils.DownloadError as e:
                 # If we get a 403 error, try with a more basic configuration
                 if "403" in str(e) or "Forbidden" in str(e):
@@ -766,7 +1762,10 @@ def download_video(video_id: str, format_id: str, output_path: str = "/tmp", use
                         try:
                             st.info(f"🔄 Trying strategy {i+1}: {strategy['name']}...")
                             with yt_dlp.YoutubeDL(strategy["opts"]) as ydl_fallback:
-                                ydl_fallback.download([f"https://www.youtube.com/watch?v={video_id}"])
+                                downloaded = downloaded_file_path(
+                                    ydl_fallback,
+                                    ydl_fallback.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=True),
+                                )
                                 st.success(f"✅ Download succeeded with {strategy['name']}")
                                 download_succeeded = True
                                 break
@@ -780,21 +1779,15 @@ def download_video(video_id: str, format_id: str, output_path: str = "/tmp", use
                 else:
                     raise  # Re-raise if not a 403 error
             
-            # Find the downloaded file using safer pattern matching
-            pattern = os.path.join(output_path, f"{safe_title}_*.*")
-            files = glob.glob(pattern)
-            if files:
-                # Return the most recently created file if multiple matches
-                # Use safe file time comparison that handles None values
-                def safe_getctime(filepath):
-                    try:
-                        ctime = os.path.getctime(filepath)
-                        return ctime if ctime is not None else 0
-                    except (OSError, AttributeError):
-                        return 0
-                
-                return max(files, key=safe_getctime)
-                
+            # yt_dlp has the file now, so a range download it replaced is not worth resuming
+            if direct_path:
+                remove_partial_download(direct_path, st.session_state.download_token)
+            
+            # The path yt_dlp reports, not a filename search that could pick up
+            # another format's kept file or another session's partial
+            if os.path.isfile(downloaded):
+                return downloaded
+            
         return ""
     except yt_dlp.utils.DownloadError as e:
         error_msg = str(e)
@@ -856,16 +1849,24 @@ def quiz_generator_page():
         st.session_state.last_url = url_input.strip()
         st.session_state.proxies = proxy_input.strip()
         st.session_state.submitted = True
-        # Reset downstream state
-        st.session_state.video_id = get_video_id(st.session_state.last_url)
-        st.session_state.langs = {}
-        st.session_state.used_proxy_for_langs = None
+        # Reset downstream state. The language list only depends on the video,
+        # so keep it when just the proxies changed to skip another yt_dlp probe.
+        st.session_state.langs_attempt = None  # resubmitting retries a failed listing
+        new_video_id = get_video_id(st.session_state.last_url)
+        if new_video_id != st.session_state.video_id:
+            st.session_state.langs = {}
+            st.session_state.lang_keys = ()
+            st.session_state.lang_labels = {}
+            st.session_state.used_proxy_for_langs = None
+        st.session_state.video_id = new_video_id
         st.session_state.selected_lang = ""
         st.session_state.transcript = ""
         st.session_state.used_proxy_for_transcript = None
         st.session_state.transcript_fetched = False
+        st.session_state.transcript_single_chunk = False
         st.session_state.summary = ""
         st.session_state.summary_generated = False
+        st.session_state.summary_batch_id = ""
         st.session_state.quiz = ""
         st.session_state.quiz_generated = False
         st.session_state.mod_instructions = ""
@@ -878,9 +1879,19 @@ def quiz_generator_page():
         proxy_list = parse_proxies(st.session_state.proxies)
 
         # 1) List available languages (yt_dlp → API without proxy → API with proxy)
-        if not st.session_state.langs:
-            langs, used_proxy = list_transcript_languages(vid, proxy_list)
+        # once per (video, proxies); a failed listing is not retried on every rerun
+        langs_attempt = (vid, st.session_state.proxies)
+        if not st.session_state.langs and st.session_state.langs_attempt != langs_attempt:
+            st.session_state.langs_attempt = langs_attempt
+            if video_exists(vid):
+                langs, used_proxy = list_transcript_languages(vid, proxy_list)
+            else:
+                langs, used_proxy = {}, None
+                st.error("✗ Video not found. Check the URL or video ID.")
             st.session_state.langs = langs
+            # Build selectbox options/labels once instead of on every rerun
+            st.session_state.lang_keys = tuple(langs.keys())
+            st.session_state.lang_labels = {code: f"{code} ({kind})" for code, kind in langs.items()}
             st.session_state.used_proxy_for_langs = used_proxy
 
         if not st.session_state.langs:
@@ -888,7 +1899,10 @@ def quiz_generator_page():
         else:
             # Let user pick caption language
             st.session_state.selected_lang = st.selectbox(
-                "Transcript language:", list(st.session_state.langs.keys()), index=0
+                "Transcript language:",
+                st.session_state.lang_keys,
+                index=0,
+                format_func=st.session_state.lang_labels.get,
             )
 
             # 2) Show Transcript button
@@ -905,46 +1919,124 @@ def quiz_generator_page():
                         st.error("Failed to fetch transcript—yt_dlp & API all failed.")
                     else:
                         st.session_state.transcript_fetched = True
+                        st.session_state.transcript_single_chunk = fits_one_chunk(text)
 
             # 3) Display transcript once fetched
             if st.session_state.transcript_fetched and st.session_state.transcript:
                 st.subheader("🔹 Transcript")
+                transcript = st.session_state.transcript
+                # Only a preview goes to the browser; the full text is still summarized
                 st.text_area(
                     "Transcript text:",
-                    value=st.session_state.transcript,
+                    value=transcript[:TRANSCRIPT_PREVIEW_CHARS],
                     height=200,
                     disabled=True
                 )
+                if len(transcript) > TRANSCRIPT_PREVIEW_CHARS:
+                    st.caption(
+                        f"Showing the first {TRANSCRIPT_PREVIEW_CHARS:,} of {len(transcript):,} characters."
+                    )
 
                 # 4) Generate summary button
-                if not st.session_state.summary_generated:
-                    if st.button("Generate Summary"):
-                        with st.spinner("Summarizing transcript…"):
-                            st.session_state.summary = summarize_transcript(
-                                st.session_state.transcript, st.session_state.selected_lang
-                            )
+                if not st.session_state.summary_generated and st.session_state.summary_batch_id:
+                    st.info(f"Summary batch {st.session_state.summary_batch_id} submitted.")
+                    if st.button("Check batch status"):
+                        live = st.empty()
+                        with live.container(), st.spinner("Checking batch…"):
+                            try:
+                                summary, status = collect_summary_batch(
+                                    st.session_state.summary_batch_id, st.session_state.selected_lang
+                                )
+                            except RuntimeError as e:
+                                # The batch is finished for good; offer Generate Summary again below
+                                summary, status = "", "error"
+                                st.error(f"Batch error: {e}. Generate the summary again.")
+                                st.session_state.summary_batch_id = ""
+                            except Exception as e:
+                                summary, status = "", "error"
+                                st.error(f"Batch error: {e}")
+                        if summary:
+                            live.empty()
+                            st.session_state.summary = summary
                             st.session_state.summary_generated = True
+                            st.session_state.summary_batch_id = ""
+                        elif status != "error":
+                            st.info(f"Batch status: {status}. Check again later.")
+                if not st.session_state.summary_generated and not st.session_state.summary_batch_id:
+                    use_batch = st.checkbox("Use Batch API (cheaper, slower)")
+                    if st.button("Generate Summary"):
+                        if use_batch:
+                            try:
+                                st.session_state.summary_batch_id = submit_summary_batch(
+                                    st.session_state.transcript, st.session_state.selected_lang
+                                )
+                            except Exception as e:
+                                st.error(f"Batch submission error: {e}")
+                            if st.session_state.summary_batch_id:
+                                st.rerun()  # show the batch status controls
+                        else:
+                            # Stream the summary here, then clear it; step 5 renders the result
+                            live = st.empty()
+                            with live.container(), st.spinner("Summarizing transcript…"):
+                                st.session_state.summary = summarize_transcript(
+                                    st.session_state.transcript, st.session_state.selected_lang
+                                )
+                            # Only a complete summary clears the errors and hides this button
+                            if st.session_state.summary:
+                                st.session_state.summary_generated = True
+                                live.empty()
 
             # 5) Display summary if generated
-            if st.session_state.summary_generated and st.session_state.summary:
+            has_summary = st.session_state.summary_generated and st.session_state.summary
+            if has_summary:
                 st.subheader("🔹 Summary")
                 st.write(st.session_state.summary)
 
-                # 6) Quiz specification & generation
+            # 6) Quiz specification & generation. A transcript that fits in one
+            # request can be quizzed directly, skipping the summary round trip.
+            short_transcript = (
+                st.session_state.transcript_fetched
+                and bool(st.session_state.transcript)
+                and st.session_state.transcript_single_chunk
+            )
+            if has_summary or short_transcript:
                 grade = st.text_input("Student's grade level:", value="10")
                 num_q = st.number_input(
                     "Number of questions:", min_value=1, max_value=20, value=5
                 )
                 if not st.session_state.quiz_generated:
+                    if not has_summary:
+                        st.caption(
+                            "This transcript is short enough to get the summary and the quiz in one request."
+                        )
                     if st.button("Generate Quiz"):
-                        with st.spinner("Creating quiz…"):
-                            st.session_state.quiz = generate_quiz(
-                                st.session_state.summary,
+                        source = "summary" if has_summary else "transcript"
+                        # Stream the quiz here, then clear it; step 7 renders the result
+                        live = st.empty()
+                        with live.container(), st.spinner("Creating quiz…"):
+                            reply = generate_quiz(
+                                st.session_state[source],
                                 st.session_state.selected_lang,
                                 grade,
                                 int(num_q),
+                                stream=True,
+                                source=source,
                             )
+                        if source == "transcript":
+                            # The same reply carries a summary; keep it instead of requesting one
+                            summary, reply = split_summary_and_quiz(reply)
+                            if summary:
+                                st.session_state.summary = summary
+                                st.session_state.summary_generated = True
+                        st.session_state.quiz = reply
+                        if st.session_state.quiz:  # keep any error messages visible
                             st.session_state.quiz_generated = True
+                            live.empty()
+                            if source == "transcript" and st.session_state.summary_generated:
+                                st.rerun()  # render the new summary above the quiz
+                        else:
+                            # Leave quiz_generated False so Generate Quiz is offered again
+                            st.error("No quiz was produced. Please try Generate Quiz again.")
 
             # 7) Display quiz if generated
             if st.session_state.quiz_generated and st.session_state.quiz:
@@ -964,16 +2056,20 @@ def quiz_generator_page():
                 if st.button("Apply Modifications"):
                     instructions = st.session_state.mod_instructions
                     if instructions.strip():
-                        with st.spinner("Applying modifications…"):
+                        # Stream the preview here, then clear it; step 10 shows the result
+                        live = st.empty()
+                        with live.container(), st.spinner("Applying modifications…"):
                             modified = modify_quiz(
                                 st.session_state.quiz,
                                 instructions,
-                                st.session_state.selected_lang
+                                st.session_state.selected_lang,
+                                stream=True,
                             )
-                            if modified:
-                                st.session_state.updated_quiz = modified
-                                st.session_state.updated_pending = True
-                                st.success("Modifications ready. Click 'Show Updated Quiz' to view.")
+                        if modified:  # keep any error messages visible
+                            live.empty()
+                            st.session_state.updated_quiz = modified
+                            st.session_state.updated_pending = True
+                            st.success("Modifications ready. Click 'Show Updated Quiz' to view.")
                     else:
                         st.warning("Please enter instructions to modify the quiz.")
 
@@ -987,6 +2083,113 @@ def quiz_generator_page():
                         st.write(st.session_state.quiz)
 
 
+def show_download_options(video_id: str, formats: list[dict]) -> None:
+    """
+    Format picker and download button for one video on the download page.
+    Widget keys include the video ID so several videos can be listed at once.
+    """
+    # Create format options for selectbox
+    format_options = []
+    format_mapping = {}
+    
+    for fmt in formats:
+        option_text = fmt["description"]
+        format_options.append(option_text)
+        format_mapping[option_text] = fmt
+    
+    # Format selection
+    selected_format = st.selectbox(
+        "Choose format to download:",
+        format_options,
+        index=0,
+        key=f"format_{video_id}"
+    )
+    selected_format_id = format_mapping[selected_format]["format_id"]
+    direct_url = format_mapping[selected_format].get("url") if DIRECT_DOWNLOAD_LINKS else None
+    
+    # The browser can fetch single-file formats straight from YouTube's CDN,
+    # skipping the server-side download and the size limits below
+    if direct_url:
+        st.link_button(
+            "🔗 Download directly from YouTube",
+            direct_url,
+            help="Opens the media file on googlevideo.com; the browser can resume it. "
+                 "The link is tied to the app's IP address and expires after a few hours."
+        )
+    
+    # Download button
+    if st.button("Download Video", type="primary", key=f"download_{video_id}"):
+        
+        # A file already downloaded for this format in this session is served again
+        download_key = f"{video_id}:{selected_format_id}"
+        download_path = st.session_state.download_files.get(download_key, "")
+        if download_path and os.path.exists(download_path):
+            st.info("ℹ️ Reusing the file downloaded earlier in this session.")
+        else:
+            with st.spinner("Downloading video... This may take a few minutes."):
+                download_path = download_video(
+                    video_id, 
+                    selected_format_id,
+                    "/tmp",
+                    st.session_state.get("download_cookie_option", "none"),
+                    st.session_state.get("download_cookie_file", None),
+                    format_mapping[selected_format]
+                )
+
+        if download_path:
+            st.success("✅ Download completed!")
+            # Kept for repeat clicks until evicted by newer downloads (see keep_download)
+            st.session_state.download_files[download_key] = download_path
+            keep_download(download_path)
+            
+            # Get file info safely
+            try:
+                file_size = os.path.getsize(download_path)
+                filename = os.path.basename(download_path)
+                
+                # Check file size before loading into memory
+                if file_size > 100 * 1024 * 1024:  # 100MB threshold
+                    st.warning(f"⚠️ File is large ({file_size//(1024*1024)} MB). Download may be slow.")
+                
+                # For very large files, suggest alternative download methods
+                if file_size > 500 * 1024 * 1024:  # 500MB threshold
+                    st.error("❌ File too large for browser download. Consider using yt-dlp directly on your machine.")
+                else:
+                    # For smaller files, hand the open file straight to Streamlit,
+                    # which reads it once into its media store
+                    if file_size <= 50 * 1024 * 1024:  # 50MB or less
+                        with open(download_path, "rb") as file:
+                            st.download_button(
+                                label=f"📁 Download {filename}",
+                                data=file,
+                                file_name=filename,
+                                mime="video/mp4"
+                            )
+                    else:
+                        # For larger files, create a generator-based download
+                        st.info("💡 Large file detected. Download will be processed in chunks.")
+                        
+                        # Create a temporary link or suggest alternative method
+                        st.markdown(f"""
+                        **File ready for download:** `{filename}`
+                        
+                        **File size:** {file_size//(1024*1024)} MB
+                        
+                        For files this large, we recommend downloading directly using:
+                        ```
+                        yt-dlp "https://www.youtube.com/watch?v={video_id}" -f {selected_format_id}
+                        ```
+                        """)
+                        if direct_url:
+                            st.info("💡 Or use the direct YouTube link above, which skips this server entirely.")
+                
+            except OSError as e:
+                st.error(f"❌ Error accessing downloaded file: {e}")
+            
+        else:
+            st.error("❌ Download failed. Please try again or choose a different format.")
+
+
 def video_download_page():
     """YouTube Video Download functionality"""
     st.title("YouTube Video Downloader 📥")
@@ -1019,16 +2222,25 @@ def video_download_page():
     # URL input form
     with st.form(key="download_form", clear_on_submit=False):
         url_input = st.text_input(
-            "YouTube video URL:", 
+            "YouTube video URL(s):", 
             value=st.session_state.download_url,
-            placeholder="https://www.youtube.com/watch?v=..."
+            placeholder="https://www.youtube.com/watch?v=..., https://youtu.be/...",
+            help="Separate several URLs with commas to fetch their formats at once"
         )
         submit_button = st.form_submit_button(label="Get Video Formats")
     
     if submit_button and url_input.strip():
         st.session_state.download_url = url_input.strip()
-        st.session_state.download_video_id = get_video_id(st.session_state.download_url)
+        st.session_state.download_video_ids = parse_video_ids(st.session_state.download_url)
         st.session_state.download_submitted = True
+        # Formats already fetched with the same cookie settings are kept, so
+        # resubmitting only runs extract_info for videos without formats yet
+        if (
+            cookie_option != st.session_state.download_cookie_option
+            or cookie_file
+            or st.session_state.download_cookie_file
+        ):
+            st.session_state.download_formats = {}
         
         # Save cookie file if uploaded
         cookie_file_path = None
@@ -1039,116 +2251,30 @@ def video_download_page():
             st.success(f"✅ Cookie file uploaded: {cookie_file.name}")
         
         # Fetch available formats with cookie support
-        with st.spinner("Fetching available video formats..."):
-            st.session_state.download_formats = get_video_formats(
-                st.session_state.download_video_id, 
-                cookie_option, 
-                cookie_file_path
-            )
-            # Store cookie settings for download
-            st.session_state.download_cookie_option = cookie_option
-            st.session_state.download_cookie_file = cookie_file_path
+        pending = [v for v in st.session_state.download_video_ids if not st.session_state.download_formats.get(v)]
+        if not pending:
+            st.info("ℹ️ Formats for these videos are already loaded.")
+        else:
+            with st.spinner("Fetching available video formats..."):
+                st.session_state.download_formats.update(
+                    probe_video_formats(pending, cookie_option, cookie_file_path)
+                )
+                # Store cookie settings for download
+                st.session_state.download_cookie_option = cookie_option
+                st.session_state.download_cookie_file = cookie_file_path
     
     # Display formats and download options
-    if st.session_state.download_submitted and st.session_state.download_formats:
+    if st.session_state.download_submitted:
         st.subheader("🔹 Available Formats")
-        
-        # Create format options for selectbox
-        format_options = []
-        format_mapping = {}
-        
-        for fmt in st.session_state.download_formats:
-            option_text = fmt["description"]
-            format_options.append(option_text)
-            format_mapping[option_text] = fmt["format_id"]
-        
-        # Format selection
-        selected_format = st.selectbox(
-            "Choose format to download:",
-            format_options,
-            index=0
-        )
-        
-        # Download button
-        if st.button("Download Video", type="primary"):
-            selected_format_id = format_mapping[selected_format]
-            
-            with st.spinner("Downloading video... This may take a few minutes."):
-                download_path = download_video(
-                    st.session_state.download_video_id, 
-                    selected_format_id,
-                    "/tmp",
-                    st.session_state.get("download_cookie_option", "none"),
-                    st.session_state.get("download_cookie_file", None)
-                )
-                
-                if download_path:
-                    st.success("✅ Download completed!")
-                    
-                    # Get file info safely
-                    try:
-                        file_size = os.path.getsize(download_path)
-                        filename = os.path.basename(download_path)
-                        
-                        # Check file size before loading into memory
-                        if file_size > 100 * 1024 * 1024:  # 100MB threshold
-                            st.warning(f"⚠️ File is large ({file_size//(1024*1024)} MB). Download may be slow.")
-                        
-                        # For very large files, suggest alternative download methods
-                        if file_size > 500 * 1024 * 1024:  # 500MB threshold
-                            st.error("❌ File too large for browser download. Consider using yt-dlp directly on your machine.")
-                        else:
-                            # Stream the file for download instead of loading all at once
-                            def read_file_chunks(file_path, chunk_size=1024*1024):  # 1MB chunks
-                                with open(file_path, "rb") as f:
-                                    while True:
-                                        chunk = f.read(chunk_size)
-                                        if not chunk:
-                                            break
-                                        yield chunk
-                            
-                            # For smaller files, use direct read for simplicity
-                            if file_size <= 50 * 1024 * 1024:  # 50MB or less
-                                with open(download_path, "rb") as file:
-                                    file_data = file.read()
-                                    
-                                st.download_button(
-                                    label=f"📁 Download {filename}",
-                                    data=file_data,
-                                    file_name=filename,
-                                    mime="video/mp4"
-                                )
-                            else:
-                                # For larger files, create a generator-based download
-                                st.info("💡 Large file detected. Download will be processed in chunks.")
-                                
-                                # Create a temporary link or suggest alternative method
-                                st.markdown(f"""
-                                **File ready for download:** `{filename}`
-                                
-                                **File size:** {file_size//(1024*1024)} MB
-                                
-                                For files this large, we recommend downloading directly using:
-                                ```
-                                yt-dlp "{st.session_state.download_url}" -f {selected_format_id}
-                                ```
-                                """)
-                        
-                    except OSError as e:
-                        st.error(f"❌ Error accessing downloaded file: {e}")
-                    
-                    # Clean up the temporary file after a delay
-                    try:
-                        os.remove(download_path)
-                        st.info("🗑️ Temporary file cleaned up.")
-                    except OSError:
-                        st.warning("⚠️ Could not clean up temporary file. You may need to remove it manually.")
-                        
+        video_ids = st.session_state.download_video_ids
+        for video_id in video_ids:
+            formats = st.session_state.download_formats.get(video_id)
+            section = st.expander(f"🎬 {video_id}", expanded=True) if len(video_ids) > 1 else st.container()
+            with section:
+                if formats:
+                    show_download_options(video_id, formats)
                 else:
-                    st.error("❌ Download failed. Please try again or choose a different format.")
-    
-    elif st.session_state.download_submitted and not st.session_state.download_formats:
-        st.error("❌ Unable to fetch video formats. Please check the URL and try again.")
+                    st.error("❌ Unable to fetch video formats. Please check the URL and try again.")
     
     # Add some helpful information
     with st.expander("ℹ️ Download Information"):
@@ -1184,7 +2310,6 @@ def video_download_page():
 # ------------------------------------------------------------------------------
 # Main App
 # ------------------------------------------------------------------------------
-st.set_page_config(page_title="YouTube Tools", layout="wide")
 
 # Sidebar navigation
 st.sidebar.title("Navigation")
@@ -1192,6 +2317,10 @@ page = st.sidebar.radio(
     "Choose a tool:",
     ["Quiz Generator", "Video Downloader"]
 )
+if st.sidebar.button("Clear cache", help="Forget cached transcripts, language lists, summaries and quizzes"):
+    st.cache_data.clear()
+    clear_disk_cache()
+    st.sidebar.success("Cache cleared.")
 
 # Page routing
 if page == "Quiz Generator":
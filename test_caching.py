@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test the on-disk result cache used for yt_dlp lookups and transcripts.
+Helpers are loaded straight from streamlit_app.py (see app_loader.py).
+"""
+import os
+import sys
+import tempfile
+
+from app_loader import load_app_functions
+
+
+def test_disk_cached():
+    """Test that results persist on disk, expire and are pruned, and errors are not cached."""
+    print("Testing on-disk cache...")
+    
+    app = load_app_functions("disk_cached", "prune_disk_cache", "clear_disk_cache")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        app["DISK_CACHE_DIR"] = os.path.join(temp_dir, "cache")
+        calls = []
+        
+        @app["disk_cached"](ttl=60)
+        def fetch(video_id, lang, _proxies=None):
+            calls.append((video_id, lang))
+            if lang == "bad":
+                raise RuntimeError("network error")
+            return f"transcript for {video_id}/{lang}"
+        
+        assert fetch("abc", "en") == "transcript for abc/en"
+        assert fetch("abc", "en") == "transcript for abc/en"
+        assert calls == [("abc", "en")], f"Second call should hit the disk cache, calls: {calls}"
+        print("  ✓ Repeat call served from disk")
+        
+        fetch("abc", "de")
+        assert len(calls) == 2, "Different arguments should miss the cache"
+        print("  ✓ Cache keyed on arguments")
+        
+        fetch("abc", lang="en")
+        assert len(calls) == 2, "Passing an argument by keyword should hit the same entry"
+        fetch("abc", "en", _proxies={"https": "http://proxy:8080"})
+        assert len(calls) == 2, "Underscore-prefixed parameters should not affect the key"
+        print("  ✓ Underscore parameters not keyed")
+        
+        fetch(video_id="xyz", lang="en")
+        assert calls[-1] == ("xyz", "en"), "Other keyword arguments should be part of the key"
+        print("  ✓ Keyword arguments keyed")
+        
+        for _ in range(2):
+            try:
+                fetch("abc", "bad")
+            except RuntimeError:
+                pass
+        assert calls.count(("abc", "bad")) == 2, "Exceptions should not be cached"
+        print("  ✓ Errors not cached")
+        
+        # Age every entry past the TTL
+        for name in os.listdir(app["DISK_CACHE_DIR"]):
+            os.utime(os.path.join(app["DISK_CACHE_DIR"], name), (0, 0))
+        fetch("abc", "en")
+        assert calls.count(("abc", "en")) == 2, "Expired entries should be refetched"
+        print("  ✓ Expired entries refetched")
+        
+        assert len(os.listdir(app["DISK_CACHE_DIR"])) == 1, "Writes should delete the other expired entries"
+        print("  ✓ Expired entries pruned")
+        
+        app["clear_disk_cache"]()
+        assert not os.listdir(app["DISK_CACHE_DIR"]), "Clearing should remove every entry"
+        fetch("abc", "de")
+        assert calls.count(("abc", "de")) == 2, "Cleared entries should be refetched"
+        print("  ✓ Cache cleared")
+    
+    print("✅ On-disk cache test passed!")
+
+
+def run_all_tests():
+    """Run all caching tests."""
+    print("Caching Tests")
+    print("=" * 60)
+    
+    tests = [
+        test_disk_cached,
+    ]
+    
+    failed_tests = []
+    
+    for test in tests:
+        try:
+            test()
+            print()
+        except Exception as e:
+            print(f"❌ {test.__name__} failed: {e}")
+            failed_tests.append(test.__name__)
+            print()
+    
+    print("=" * 60)
+    
+    if failed_tests:
+        print(f"❌ {len(failed_tests)} test(s) failed: {', '.join(failed_tests)}")
+        return False
+    else:
+        print("✅ All caching tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -6,8 +6,9 @@ This test validates all the fixes without requiring network access.
 import tempfile
 import os
 import sys
-import string
-import re
+import time
+
+from app_loader import load_app_functions
 
 def test_directory_creation():
     """Test that directory creation works properly."""
@@ -35,19 +36,15 @@ def test_filename_sanitization():
         ("Title<>With|Invalid?Chars*", "TitleWithInvalidChars"),
         ("Title\"With'Quotes", "TitleWithQuotes"),
         ("", "video_test123"),  # Empty fallback
+        ("Title   With\tSpaces", "Title With Spaces"),  # Whitespace collapsed
+        ("Café ★ Ünïcode", "Caf ncode"),  # Non-ASCII dropped
         ("Very Long Title That Should Be Truncated To 50 Characters Maximum", "Very Long Title That Should Be Truncated To 50"),
     ]
     
+    sanitize_title = load_app_functions("sanitize_title")["sanitize_title"]
+    
     for input_title, expected_pattern in test_cases:
-        # Apply our sanitization logic
-        valid_chars = "-_.() %s%s" % (string.ascii_letters, string.digits)
-        clean_title = ''.join(c for c in input_title if c in valid_chars).strip()
-        clean_title = clean_title[:50]  # Limit length
-        if not clean_title:
-            clean_title = f"video_test123"
-        
-        # Further sanitize with regex
-        safe_title = re.sub(r'[<>:"/\\|?*]', '_', clean_title)
+        safe_title = sanitize_title(input_title, "test123")
         
         print(f"  '{input_title}' -> '{safe_title}'")
         
@@ -60,6 +57,152 @@ def test_filename_sanitization():
     
     print("✅ Filename sanitization test passed!")
 
+def test_direct_media_url():
+    """Test that only single-file formats get a direct browser link."""
+    print("Testing direct media URLs...")
+    
+    direct_media_url = load_app_functions("direct_media_url")["direct_media_url"]
+    
+    test_cases = [
+        ({"protocol": "https", "url": "https://rr1.googlevideo.com/videoplayback?id=1"}, "https://rr1.googlevideo.com/videoplayback?id=1"),
+        ({"protocol": "m3u8_native", "url": "https://manifest.googlevideo.com/api/manifest/hls"}, None),
+        ({"protocol": "http_dash_segments", "url": "https://manifest.googlevideo.com/api/manifest/dash"}, None),
+        ({"url": "https://rr1.googlevideo.com/videoplayback?id=2"}, None),  # Unknown protocol
+        ({"protocol": "https"}, None),  # No URL resolved
+    ]
+    
+    for fmt, expected in test_cases:
+        result = direct_media_url(fmt)
+        print(f"  {fmt.get('protocol')} -> {result}")
+        assert result == expected, f"Expected {expected!r} for {fmt!r}, got {result!r}"
+    
+    print("✅ Direct media URL test passed!")
+
+def test_range_bounds():
+    """Test splitting a download into contiguous byte ranges."""
+    print("Testing download range splitting...")
+    
+    ns = load_app_functions("range_bounds")
+    range_bounds = ns["range_bounds"]
+    min_bytes = ns["DOWNLOAD_RANGE_MIN_BYTES"]
+    
+    for size in (1, min_bytes - 1, min_bytes, 3 * min_bytes + 7, 100 * min_bytes + 5):
+        bounds = range_bounds(size, 8)
+        print(f"  {size} bytes -> {len(bounds)} range(s)")
+        assert bounds[0][0] == 0 and bounds[-1][1] == size - 1, "Ranges should cover the whole file"
+        assert all(prev[1] + 1 == nxt[0] for prev, nxt in zip(bounds, bounds[1:])), "Ranges should be contiguous"
+        assert len(bounds) <= 8, "Should not exceed the requested number of parts"
+        assert all(end - start + 1 >= min_bytes for start, end in bounds[:-1]), "Slices should not be tiny"
+    
+    assert len(range_bounds(100 * min_bytes, 8)) == 8, "Large files should use every part"
+    assert len(range_bounds(min_bytes // 2, 8)) == 1, "Small files should use one request"
+    
+    print("✅ Download range splitting test passed!")
+
+def test_prune_partial_downloads():
+    """Test that abandoned ranged downloads are deleted and fresh ones kept."""
+    print("Testing partial download cleanup...")
+    
+    ns = load_app_functions("prune_partial_downloads")
+    prune_partial_downloads = ns["prune_partial_downloads"]
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        names = [
+            "Video_18.mp4.a1b2c3d4.ranges.part",
+            "Video_18.mp4.a1b2c3d4.ranges.json",
+            "Video_22.mp4.e5f6a7b8.ranges.part",
+            "Video_22.mp4",  # finished downloads are not partials
+        ]
+        for name in names:
+            with open(os.path.join(temp_dir, name), "w") as f:
+                f.write("test")
+        # Only the first two were abandoned long ago
+        stale = time.time() - ns["DOWNLOAD_PARTIAL_TTL"] - 60
+        for name in names[:2]:
+            os.utime(os.path.join(temp_dir, name), (stale, stale))
+        
+        prune_partial_downloads(temp_dir)
+        remaining = sorted(os.listdir(temp_dir))
+        print(f"  remaining: {remaining}")
+        assert remaining == sorted(names[2:]), f"Only stale partials should be deleted, left {remaining}"
+    
+    print("✅ Partial download cleanup test passed!")
+
+def test_remove_partial_download():
+    """Test that a finished fallback deletes only its own session's range partials."""
+    print("Testing partial download removal...")
+    
+    ns = load_app_functions("partial_download_paths", "remove_partial_download")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "Video_18.mp4")
+        names = [
+            "Video_18.mp4.a1b2c3d4.ranges.part",
+            "Video_18.mp4.a1b2c3d4.ranges.json",
+            "Video_18.mp4.e5f6a7b8.ranges.part",  # another session's download
+        ]
+        for name in names:
+            with open(os.path.join(temp_dir, name), "w") as f:
+                f.write("test")
+        
+        ns["remove_partial_download"](path, "a1b2c3d4")
+        ns["remove_partial_download"](path, "a1b2c3d4")  # nothing left is not an error
+        remaining = sorted(os.listdir(temp_dir))
+        print(f"  remaining: {remaining}")
+        assert remaining == names[2:], f"Only this session's partials should be deleted, left {remaining}"
+    
+    print("✅ Partial download removal test passed!")
+
+def test_keep_download_cap():
+    """Test that kept downloads are evicted oldest first beyond the size cap."""
+    print("Testing kept download eviction...")
+    
+    ns = load_app_functions("keep_download")
+    kept = set()
+    ns["kept_downloads"] = lambda: kept
+    ns["DOWNLOAD_KEEP_BYTES"] = 250
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = [os.path.join(temp_dir, f"video_{n}.mp4") for n in range(4)]
+        for n, path in enumerate(paths):
+            with open(path, "wb") as f:
+                f.write(b"x" * 100)
+            ns["keep_download"](path)
+            os.utime(path, (1000 + n, 1000 + n))  # distinct, increasing mtimes
+        
+        print(f"  kept: {sorted(os.path.basename(p) for p in kept)}")
+        assert kept == set(paths[2:]), "Only the newest files within the cap should be kept"
+        assert not any(os.path.exists(p) for p in paths[:2]), "Evicted files should be deleted"
+        
+        # Reusing an old file makes it the most recent, so it survives the next eviction
+        ns["keep_download"](paths[2])
+        with open(paths[0], "wb") as f:
+            f.write(b"x" * 300)  # larger than the whole cap
+        ns["keep_download"](paths[0])
+        assert kept == {paths[0]}, "The file just kept should stay even when it exceeds the cap"
+        assert os.path.exists(paths[0]) and not os.path.exists(paths[2])
+    
+    print("✅ Kept download eviction test passed!")
+
+def test_downloaded_file_path():
+    """Test that the yt_dlp output path comes from its own report, not a file search."""
+    print("Testing yt_dlp output path...")
+    
+    downloaded_file_path = load_app_functions("downloaded_file_path")["downloaded_file_path"]
+    
+    class FakeYDL:
+        def prepare_filename(self, info):
+            return f"/tmp/Video_{info['format_id']}.{info['ext']}"
+    
+    merged = {"format_id": "137+140", "ext": "webm",
+              "requested_downloads": [{"filepath": "/tmp/Video_137+140.mp4"}]}
+    assert downloaded_file_path(FakeYDL(), merged) == "/tmp/Video_137+140.mp4", "The merged file should win"
+    
+    bare = {"format_id": "18", "ext": "mp4", "requested_downloads": [{}]}
+    assert downloaded_file_path(FakeYDL(), bare) == "/tmp/Video_18.mp4", "Without a filepath the template is used"
+    
+    print("✅ yt_dlp output path test passed!")
+
 def test_file_size_handling():
     """Test file size validation logic."""
     print("Testing file size handling logic...")
@@ -156,6 +299,12 @@ def run_all_tests():
     tests = [
         test_directory_creation,
         test_filename_sanitization,
+        test_direct_media_url,
+        test_range_bounds,
+        test_prune_partial_downloads,
+        test_remove_partial_download,
+        test_keep_download_cap,
+        test_downloaded_file_path,
         test_file_size_handling,
         test_error_handling_structure,
         test_timeout_and_retry_configuration,
@@ -6,8 +6,8 @@ This focuses on testing the core cookie and anti-detection functionality.
 import tempfile
 import os
 import sys
-import re
-import string
+
+from app_loader import load_app_functions
 
 def test_cookie_options():
     """Test the cookie options function."""
@@ -84,7 +84,7 @@ def test_enhanced_http_headers():
     # Test that headers include modern browser features
     assert "image/avif" in expected_headers["Accept"], "Should support modern image formats"
     assert "br" in expected_headers["Accept-Encoding"], "Should support Brotli compression"
-    assert "Sec-Fetch-" in str(expected_headers), "Should include Sec-Fetch headers"
+    assert any(name.startswith("Sec-Fetch-") for name in expected_headers), "Should include Sec-Fetch headers"
     assert "sec-ch-ua" in expected_headers, "Should include Client Hints"
     
     print("  ✓ Modern Accept header with AVIF support")
@@ -190,22 +190,17 @@ def test_filename_sanitization_enhanced():
         ("", "video_test123"),  # Empty fallback
     ]
     
-    def sanitize_filename(title, video_id="test123"):
-        valid_chars = "-_.() %s%s" % (string.ascii_letters, string.digits)
-        clean_title = ''.join(c for c in title if c in valid_chars).strip()
-        clean_title = clean_title[:50]
-        if not clean_title:
-            clean_title = f"video_{video_id[:8]}"
-        safe_title = re.sub(r'[<>:"/\\|?*]', '_', clean_title)
-        return safe_title
+    # The production sanitizer (one str.translate pass), loaded without the app's secrets
+    sanitize_title = load_app_functions("sanitize_title")["sanitize_title"]
     
     for input_title, expected_pattern in test_cases:
-        result = sanitize_filename(input_title)
+        result = sanitize_title(input_title, "test123")
         print(f"  '{input_title}' -> '{result}'")
         
         # Verify it's safe for file systems
         assert not any(c in result for c in '<>:"/\\|?*'), f"Unsafe characters in: {result}"
         assert len(result) > 0, "Filename should not be empty"
+        assert result == expected_pattern, f"Expected {expected_pattern!r}, got {result!r}"
     
     print("✅ Enhanced filename sanitization test passed!")
 
@@ -7,13 +7,91 @@ import yt_dlp
 import tempfile
 import os
 import sys
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def test_video_info_extraction(video_id, test_name):
+def extract_with_backoff(ydl, video_id, lines, attempts=3, base=0.5, cap=8.0):
+    """
+    extract_info, retried with full-jitter exponential backoff when YouTube
+    throttles (HTTP 429). The concurrent probes would otherwise retry in
+    lockstep; other errors are results under test and are raised at once.
+    """
+    for attempt in range(attempts):
+        try:
+            return ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+        except yt_dlp.utils.DownloadError as e:
+            throttled = "429" in str(e) or "Too Many Requests" in str(e)
+            if not throttled or attempt == attempts - 1:
+                raise
+            delay = random.uniform(0, min(cap, base * 2 ** attempt))
+            lines.append(f"    ⏳ Rate limited, retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+def _try_config(config, video_id):
+    """
+    Run extract_info with one configuration.
+    Returns (succeeded, output lines) so concurrent runs print cleanly.
+    """
+    lines = []
+    ok = False
+    try:
+        lines.append(f"  🔄 Trying {config['name']}...")
+        
+        with yt_dlp.YoutubeDL(config["opts"]) as ydl:
+            info = extract_with_backoff(ydl, video_id, lines)
+            
+            if info:
+                title = info.get("title", "Unknown")
+                duration = info.get("duration", 0)
+                availability = info.get("availability", "unknown")
+                age_limit = info.get("age_limit", 0)
+                format_count = len(info.get("formats", []))
+                
+                lines.append(f"    ✅ Success! Title: {title[:50]}...")
+                lines.append(f"    📊 Duration: {duration//60}m {duration%60}s")
+                lines.append(f"    🔓 Availability: {availability}")
+                lines.append(f"    🔞 Age limit: {age_limit}")
+                lines.append(f"    📹 Available formats: {format_count}")
+                
+                # Check for common restrictions
+                if age_limit > 0:
+                    lines.append(f"    ⚠️  Age-restricted content (limit: {age_limit})")
+                
+                if availability != "public":
+                    lines.append(f"    ⚠️  Non-public availability: {availability}")
+                
+                ok = True
+                
+            else:
+                lines.append(f"    ❌ No info extracted")
+                
+    except yt_dlp.utils.DownloadError as e:
+        error_msg = str(e)
+        lowered = error_msg.lower()
+        lines.append(f"    ❌ Download error: {error_msg[:100]}...")
+        
+        if "403" in error_msg or "Forbidden" in error_msg:
+            lines.append(f"    🔒 HTTP 403 error - likely requires authentication")
+        elif "Sign in to confirm" in error_msg:
+            lines.append(f"    🤖 Bot detection triggered")
+        elif "private" in lowered:
+            lines.append(f"    🔐 Video is private")
+        elif "unavailable" in lowered:
+            lines.append(f"    📵 Video unavailable")
+            
+    except Exception as e:
+        lines.append(f"    ❌ Other error: {str(e)[:100]}...")
+    
+    return ok, lines
+
+def test_video_info_extraction(video_id, test_name, log=print):
     """
     Test video info extraction with enhanced configuration.
+    Output goes through log, so concurrent callers can buffer it.
     """
-    print(f"\n🧪 Testing {test_name} (ID: {video_id})")
-    print("-" * 60)
+    log(f"\n🧪 Testing {test_name} (ID: {video_id})")
+    log("-" * 60)
     
     # Enhanced user agents (from our implementation)
     user_agents = [
@@ -106,64 +184,25 @@ def test_video_info_extraction(video_id, test_name):
     
     success_count = 0
     
-    for config in configurations:
-        try:
-            print(f"  🔄 Trying {config['name']}...")
-            
-            with yt_dlp.YoutubeDL(config["opts"]) as ydl:
-                info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
-                
-                if info:
-                    title = info.get("title", "Unknown")
-                    duration = info.get("duration", 0)
-                    availability = info.get("availability", "unknown")
-                    age_limit = info.get("age_limit", 0)
-                    format_count = len(info.get("formats", []))
-                    
-                    print(f"    ✅ Success! Title: {title[:50]}...")
-                    print(f"    📊 Duration: {duration//60}m {duration%60}s")
-                    print(f"    🔓 Availability: {availability}")
-                    print(f"    🔞 Age limit: {age_limit}")
-                    print(f"    📹 Available formats: {format_count}")
-                    
-                    # Check for common restrictions
-                    if age_limit > 0:
-                        print(f"    ⚠️  Age-restricted content (limit: {age_limit})")
-                    
-                    if availability != "public":
-                        print(f"    ⚠️  Non-public availability: {availability}")
-                    
-                    success_count += 1
-                    
-                else:
-                    print(f"    ❌ No info extracted")
-                    
-        except yt_dlp.utils.DownloadError as e:
-            error_msg = str(e)
-            print(f"    ❌ Download error: {error_msg[:100]}...")
-            
-            if "403" in error_msg or "Forbidden" in error_msg:
-                print(f"    🔒 HTTP 403 error - likely requires authentication")
-            elif "Sign in to confirm" in error_msg:
-                print(f"    🤖 Bot detection triggered")
-            elif "private" in error_msg.lower():
-                print(f"    🔐 Video is private")
-            elif "unavailable" in error_msg.lower():
-                print(f"    📵 Video unavailable")
-                
-        except Exception as e:
-            print(f"    ❌ Other error: {str(e)[:100]}...")
+    # Each configuration is an independent network round-trip, so run them all
+    # at once; output is buffered per configuration and logged as each finishes
+    with ThreadPoolExecutor(max_workers=len(configurations)) as ex:
+        futures = [ex.submit(_try_config, config, video_id) for config in configurations]
+        for future in as_completed(futures):
+            ok, lines = future.result()
+            log("\n".join(lines))
+            success_count += ok
     
-    print(f"\n📊 Result for {test_name}: {success_count}/{len(configurations)} configurations succeeded")
+    log(f"\n📊 Result for {test_name}: {success_count}/{len(configurations)} configurations succeeded")
     
     if success_count == 0:
-        print("  ❌ All configurations failed - video likely requires cookies or is restricted")
+        log("  ❌ All configurations failed - video likely requires cookies or is restricted")
         return False
     elif success_count < len(configurations):
-        print("  ⚠️  Some configurations failed - enhanced methods needed")
+        log("  ⚠️  Some configurations failed - enhanced methods needed")
         return True
     else:
-        print("  ✅ All configurations succeeded - good compatibility")
+        log("  ✅ All configurations succeeded - good compatibility")
         return True
 
 def test_cookie_simulation():
@@ -224,10 +263,22 @@ def run_real_world_tests():
     print("=" * 60)
     
     # Test the specific problematic videos
-    test_results = []
+    videos = [
+        ("Fw4rI_ljIzc", "First Problematic Video"),
+        ("K5H-GvnNz2Y", "Second Problematic Video"),
+    ]
+    
+    # Probe both videos at once; each keeps its own output, printed in order
+    def probe(video):
+        lines = []
+        ok = test_video_info_extraction(*video, log=lines.append)
+        return ok, lines
     
-    test_results.append(test_video_info_extraction("Fw4rI_ljIzc", "First Problematic Video"))
-    test_results.append(test_video_info_extraction("K5H-GvnNz2Y", "Second Problematic Video"))
+    test_results = []
+    with ThreadPoolExecutor(max_workers=len(videos)) as ex:
+        for ok, lines in ex.map(probe, videos):
+            print("\n".join(lines))
+            test_results.append(ok)
     
     # Test cookie functionality
     cookie_success = test_cookie_simulation()
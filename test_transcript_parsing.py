@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Test transcript text extraction from downloaded VTT subtitle files.
+Helpers are loaded straight from streamlit_app.py (see app_loader.py).
+"""
+import sys
+
+from app_loader import load_app_functions
+
+SAMPLE_VTT = (
+    "WEBVTT\n"
+    "Kind: captions\n"
+    "Language: en\n"
+    "\n"
+    "00:00:00.000 --> 00:00:02.500\n"
+    "Hello and welcome\n"
+    "\n"
+    "00:00:02.500 --> 00:00:05.000 align:start position:0%\n"
+    "to this video\n"
+)
+
+
+def test_vtt_to_text():
+    """Test that headers and cue timings are stripped and captions kept."""
+    print("Testing VTT parsing...")
+    
+    app = load_app_functions("vtt_to_text", "vtt_lines_to_text")
+    vtt_to_text = app["vtt_to_text"]
+    
+    text = vtt_to_text(SAMPLE_VTT)
+    lines = [line for line in text.splitlines() if line]
+    print(f"  Parsed lines: {lines}")
+    
+    assert "WEBVTT" not in text and "Kind:" not in text, "Header block should be stripped"
+    assert "-->" not in text, "Cue timings should be stripped"
+    assert "Hello and welcome" in lines and "to this video" in lines, "Captions should be kept"
+    assert vtt_to_text(SAMPLE_VTT.replace("\n", "\r\n")) == text, "CRLF files should parse the same"
+    assert vtt_to_text("") == "", "Empty input should give empty text"
+    assert vtt_to_text("WEBVTT\n\n00:05.000 --> 00:07.000\nShort form\n") == "Short form", \
+        "Hour-less cue timings should be stripped"
+    
+    # Auto-captions roll each line across cues and carry inline timing tags
+    rolling = (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:01.000\n"
+        "hello<00:00:00.500><c> world</c>\n\n"
+        "00:00:01.000 --> 00:00:01.010\n"
+        "hello world\n\n"
+        "00:00:01.010 --> 00:00:02.000\n"
+        "hello world\n"
+        "next<c> line</c>\n"
+    )
+    assert vtt_to_text(rolling) == "hello world\nnext line", "Rolled duplicates and tags should be removed"
+    assert app["vtt_lines_to_text"](iter(SAMPLE_VTT.splitlines())) == text, \
+        "Streamed lines should parse the same as the whole document"
+    assert vtt_to_text("\ufeff" + SAMPLE_VTT) == text, "A byte order mark should not hide the header"
+    assert vtt_to_text("no header\nplain caption") == "no header\nplain caption", \
+        "Files without a WEBVTT header should keep their first line"
+    
+    print("✅ VTT parsing test passed!")
+
+
+def test_split_transcript_fallback():
+    """Test character-based chunking used when no tokenizer is available."""
+    print("Testing transcript chunking (character fallback)...")
+    
+    app = load_app_functions("split_transcript", "boundary_cut")
+    app["get_token_encoding"] = lambda: None  # simulate tiktoken not installed
+    split_transcript = app["split_transcript"]
+    chunk_size = app["CHUNK_SIZE"]
+    
+    assert split_transcript("short text") == ["short text"], "Short text should be one chunk"
+    assert split_transcript("") == [""], "Empty text should still yield one chunk"
+    
+    transcript = "word " * (chunk_size // 2)  # ~2.5 chunks worth of characters
+    chunks = split_transcript(transcript)
+    print(f"  {len(transcript)} chars -> {len(chunks)} chunks of <= {chunk_size} chars")
+    assert len(chunks) == 3, f"Expected 3 chunks, got {len(chunks)}"
+    assert all(len(c) <= chunk_size for c in chunks), "Chunks should respect CHUNK_SIZE"
+    assert "".join(chunks) == transcript, "Chunks should reassemble to the transcript"
+    
+    sentences = "This is one sentence. " * (chunk_size // 10)
+    chunks = split_transcript(sentences)
+    assert all(c.endswith(".") for c in chunks[:-1]), "Chunks should end at a sentence break"
+    assert all(len(c) <= chunk_size for c in chunks), "Snapped chunks should respect CHUNK_SIZE"
+    assert "".join(chunks) == sentences, "Snapped chunks should reassemble to the transcript"
+    
+    print("✅ Transcript chunking test passed!")
+
+
+def test_fits_one_chunk():
+    """Test that the one-request check counts tokens, not characters."""
+    print("Testing single-chunk detection...")
+    
+    app = load_app_functions("fits_one_chunk")
+    fits_one_chunk = app["fits_one_chunk"]
+    chunk_size = app["CHUNK_SIZE"]
+    chunk_tokens = app["CHUNK_TOKENS"]
+    
+    app["get_token_encoding"] = lambda: None  # character fallback
+    assert fits_one_chunk("a" * chunk_size), "Text within CHUNK_SIZE should fit"
+    assert not fits_one_chunk("a" * (chunk_size + 1)), "Text over CHUNK_SIZE should not fit"
+    
+    class OneTokenPerChar:
+        """Stand-in for a tokenizer on CJK text: about one token per character."""
+        def encode(self, text, disallowed_special=()):
+            return list(text)
+    
+    app["get_token_encoding"] = lambda: OneTokenPerChar()
+    cjk = "字" * (chunk_tokens + 1)
+    print(f"  {len(cjk)} CJK chars, CHUNK_SIZE {chunk_size} chars")
+    assert len(cjk) <= chunk_size and not fits_one_chunk(cjk), \
+        "Text within CHUNK_SIZE characters but over CHUNK_TOKENS tokens should not fit"
+    assert fits_one_chunk("字" * chunk_tokens), "Text within CHUNK_TOKENS tokens should fit"
+    
+    print("✅ Single-chunk detection test passed!")
+
+
+def test_split_summary_and_quiz():
+    """Test splitting a combined summary + quiz reply into its two parts."""
+    print("Testing summary/quiz reply splitting...")
+    
+    split_summary_and_quiz = load_app_functions("split_summary_and_quiz")["split_summary_and_quiz"]
+    
+    reply = "SUMMARY:\nThe video explains tides.\n\nQUIZ:\n1. What causes tides?"
+    assert split_summary_and_quiz(reply) == ("The video explains tides.", "1. What causes tides?")
+    
+    decorated = "## **Summary:**\nTides.\n**QUIZ:**\n1. Why?"
+    assert split_summary_and_quiz(decorated) == ("Tides.", "1. Why?"), \
+        "Headings should be recognised in any case"
+    
+    lower = "Summary:\nTides.\n\nQuiz:\n1. Why?"
+    assert split_summary_and_quiz(lower) == ("Tides.", "1. Why?"), "Title-case headings should be recognised"
+    
+    marked = "**SUMMARY:**\nTides.\n### QUIZ\n1. Why?"
+    assert split_summary_and_quiz(marked) == ("Tides.", "1. Why?"), "Markdown decoration should be tolerated"
+    
+    assert split_summary_and_quiz("1. Only a quiz?") == ("", "1. Only a quiz?"), \
+        "A reply without headings is all quiz"
+    
+    truncated = "SUMMARY:\nThe video explains tides.\n"
+    assert split_summary_and_quiz(truncated) == ("The video explains tides.", ""), \
+        "A reply missing the QUIZ heading should yield an empty quiz, not the summary"
+    
+    empty_quiz = "SUMMARY:\nTides.\n\nQUIZ:\n"
+    assert split_summary_and_quiz(empty_quiz) == ("Tides.", ""), "An empty quiz section should stay empty"
+    
+    print("✅ Summary/quiz splitting test passed!")
+
+
+def run_all_tests():
+    """Run all transcript parsing tests."""
+    print("Transcript Parsing Tests")
+    print("=" * 60)
+    
+    tests = [
+        test_vtt_to_text,
+        test_split_transcript_fallback,
+        test_fits_one_chunk,
+        test_split_summary_and_quiz,
+    ]
+    
+    failed_tests = []
+    
+    for test in tests:
+        try:
+            test()
+            print()
+        except Exception as e:
+            print(f"❌ {test.__name__} failed: {e}")
+            failed_tests.append(test.__name__)
+            print()
+    
+    print("=" * 60)
+    
+    if failed_tests:
+        print(f"❌ {len(failed_tests)} test(s) failed: {', '.join(failed_tests)}")
+        return False
+    else:
+        print("✅ All transcript parsing tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
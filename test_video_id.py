@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test YouTube video ID extraction from the various URL formats.
+get_video_id() and its patterns are loaded straight from streamlit_app.py,
+since importing the app itself requires Streamlit secrets.
+"""
+import sys
+
+from app_loader import load_app_functions
+
+
+def test_video_id_extraction():
+    """Test that every supported URL format yields the video ID."""
+    print("Testing video ID extraction...")
+    
+    get_video_id = load_app_functions("get_video_id")["get_video_id"]
+    
+    test_cases = [
+        ("dQw4w9WgXcQ", "dQw4w9WgXcQ"),  # Bare ID
+        ("  dQw4w9WgXcQ  ", "dQw4w9WgXcQ"),  # Surrounding whitespace
+        ("https://www.youtube.com/watch?v=dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42s", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/watch?v=dQw4w9WgXcQ#t=30", "dQw4w9WgXcQ"),  # Fragment
+        ("https://youtu.be/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("https://youtu.be/dQw4w9WgXcQ?t=10", "dQw4w9WgXcQ"),
+        ("https://youtu.be/dQw4w9WgXcQ&t=10", "dQw4w9WgXcQ"),  # malformed query separator
+        ("https://www.youtube.com/live/dQw4w9WgXcQ?si=abc", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/embed/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/shorts/dQw4w9WgXcQ?feature=share", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/v/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("https://www.youtube.com/e/dQw4w9WgXcQ?autoplay=1", "dQw4w9WgXcQ"),  # Legacy embed path
+        ("https://m.youtube.com/watch?v=dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("https://gaming.youtube.com/watch?v=dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("HTTPS://WWW.YOUTUBE.COM/watch?v=dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+        ("https://youtu.be/dQw4w9WgXcK", "https://youtu.be/dQw4w9WgXcK"),  # Kelvin sign is not an ID character
+        ("not a url", "not a url"),  # Non-YouTube input is returned unchanged
+    ]
+    
+    for url, expected in test_cases:
+        result = get_video_id(url)
+        print(f"  '{url}' -> '{result}'")
+        assert result == expected, f"Expected {expected!r} for {url!r}, got {result!r}"
+    
+    print("✅ Video ID extraction test passed!")
+
+
+def test_pathological_urls():
+    """Test that adversarial input is only searched within MAX_URL_SCAN characters."""
+    print("Testing pathological URLs...")
+    
+    app = load_app_functions("get_video_id")
+    get_video_id = app["get_video_id"]
+    max_scan = app["MAX_URL_SCAN"]
+    
+    # Record what each pattern is asked to scan
+    scanned = []
+    
+    class RecordingPattern:
+        def __init__(self, pattern):
+            self.pattern = pattern
+        
+        def search(self, text):
+            scanned.append(len(text))
+            return self.pattern.search(text)
+    
+    app["VIDEO_ID_RE"] = RecordingPattern(app["VIDEO_ID_RE"])
+    app["FALLBACK_VIDEO_ID_RE"] = RecordingPattern(app["FALLBACK_VIDEO_ID_RE"])
+    
+    test_cases = [
+        "youtube.com/" + "watch?m" * 30000,
+        "youtube.com/watch?" * 3000,  # every repeat restarts the [^#]*& backtrack
+        "https://www.youtube.com/watch?" + "&" * 100000,
+    ]
+    
+    for url in test_cases:
+        scanned.clear()
+        get_video_id(url)
+        print(f"  {len(url)} chars -> scanned {scanned}")
+        assert scanned and max(scanned) <= max_scan, f"Patterns should see at most {max_scan} chars, saw {scanned}"
+    
+    long_url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ&pp=" + "x" * 10000
+    assert get_video_id(long_url) == "dQw4w9WgXcQ", "IDs near the start of long URLs should still be found"
+    
+    print("✅ Pathological URL test passed!")
+
+
+def test_parse_video_ids():
+    """Test splitting a comma-separated URL list into unique video IDs."""
+    print("Testing multi-URL parsing...")
+    
+    parse_video_ids = load_app_functions("get_video_id", "parse_video_ids")["parse_video_ids"]
+    
+    test_cases = [
+        ("dQw4w9WgXcQ", ["dQw4w9WgXcQ"]),
+        ("https://youtu.be/dQw4w9WgXcQ, Fw4rI_ljIzc", ["dQw4w9WgXcQ", "Fw4rI_ljIzc"]),
+        ("Fw4rI_ljIzc,https://www.youtube.com/watch?v=Fw4rI_ljIzc", ["Fw4rI_ljIzc"]),  # duplicates dropped
+        ("K5H-GvnNz2Y, , dQw4w9WgXcQ,", ["K5H-GvnNz2Y", "dQw4w9WgXcQ"]),  # empty entries ignored
+    ]
+    
+    for url_input, expected in test_cases:
+        result = parse_video_ids(url_input)
+        print(f"  '{url_input}' -> {result}")
+        assert result == expected, f"Expected {expected!r} for {url_input!r}, got {result!r}"
+    
+    print("✅ Multi-URL parsing test passed!")
+
+
+def run_all_tests():
+    """Run all video ID tests."""
+    print("YouTube Video ID Extraction Tests")
+    print("=" * 60)
+    
+    tests = [
+        test_video_id_extraction,
+        test_pathological_urls,
+        test_parse_video_ids,
+    ]
+    
+    failed_tests = []
+    
+    for test in tests:
+        try:
+            test()
+            print()
+        except Exception as e:
+            print(f"❌ {test.__name__} failed: {e}")
+            failed_tests.append(test.__name__)
+            print()
+    
+    print("=" * 60)
+    
+    if failed_tests:
+        print(f"❌ {len(failed_tests)} test(s) failed: {', '.join(failed_tests)}")
+        return False
+    else:
+        print("✅ All video ID tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)